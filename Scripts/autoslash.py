@@ -9,32 +9,146 @@ def custom_command_runner_script():
     import asyncio
     import random
     import time
+    import heapq
+    import copy
     from pathlib import Path
     import aiohttp
-    from datetime import datetime
+    from datetime import datetime, timedelta
     from datetime import time as datetime_time
-    from discord import Webhook, Embed
+    from discord import Embed
     import os
+    import tempfile
     import shlex
     import re
     import traceback
+    import threading
+    import bisect
+    from collections import deque
+    from urllib.parse import urlsplit
+    import ipaddress
 
     # --- Helper functions ---
     CCR_JSON_DIR = Path(getScriptsPath()) / "json"
     CCR_CHANNELS_FILE = CCR_JSON_DIR / "ccr_channels.json"
     CCR_STATE_FILE = CCR_JSON_DIR / "ccr_state.json"
+    CCR_STATE_JOURNAL_FILE = CCR_JSON_DIR / "ccr_state.journal"
+    CCR_SLASH_CACHE_FILE = CCR_JSON_DIR / "ccr_slash_cache.json"
+    CCR_JOURNAL_COMPACT_EVERY = 500
+    CCR_HTTP_POOL_LIMIT = 50
+    CCR_HTTP_PER_HOST_LIMIT = 10
+    # Webhook log delivery: events are queued and sent in batches of up to 10 embeds.
+    # Past CCR_LOG_BACKPRESSURE queued events low priority ones are only counted; past CCR_LOG_QUEUE_LIMIT normal ones are dropped too
+    CCR_LOG_LOW, CCR_LOG_NORMAL, CCR_LOG_HIGH = 0, 1, 2
+    CCR_LOG_BATCH_SIZE = 10
+    CCR_LOG_BACKPRESSURE = 20
+    CCR_LOG_QUEUE_LIMIT = 200
+    # Seconds the queue must stay quiet before a pending "suppressed events" summary is sent on its own
+    CCR_LOG_SUMMARY_IDLE = 5.0
+    # Executions kept per channel for the rolling lateness aggregates in `ccr list`
+    CCR_LATENESS_WINDOW = 50
+    # Background definition lookups in flight at once (start-up warm-up and revalidation of disk-cached definitions)
+    CCR_WARMUP_CONCURRENCY = 8
+    # `ccr dryrun`: longest simulated span, assumed response time per command and idle loop turns before the virtual clock jumps
+    CCR_DRYRUN_MAX_SECONDS = 30 * 86400
+    CCR_DRYRUN_RESPONSE_SECONDS = 2.0
+    CCR_DRYRUN_SETTLE_TURNS = 10
     CCR_JSON_DIR.mkdir(parents=True, exist_ok=True)
     
-    def ccr_clear_log():
-        log_file = os.path.join(getScriptsPath(), "logs", "ccr.log")
+    CCR_LOG_FILE = os.path.join(getScriptsPath(), "logs", "ccr.log")
+    CCR_LOG_MAX_BYTES = 5 * 1024 * 1024
+    CCR_LOG_ROTATE_SECONDS = 24 * 3600
+    CCR_LOG_BACKUPS = 3
+    CCR_LOG_BUFFER_LINES = 5000
+    CCR_LOG_FLUSH_INTERVAL = 1.0
+
+    class CcrLogSink:
+        """Buffered writer for ccr.log.
+        Lines go into a bounded deque and a daemon thread appends them in batches, so logging
+        never touches the disk on the event loop. The file is rotated by size and age
+        (ccr.log -> ccr.log.1 ... ccr.log.N); a log left over from the previous run is rotated at startup."""
+
+        def __init__(self, log_file, debug_mode=False):
+            self.log_file = log_file
+            self.debug_mode = debug_mode
+            self.buffer = deque(maxlen=CCR_LOG_BUFFER_LINES)
+            self.dropped = 0
+            self.opened_at = time.time()
+            self.wakeup = threading.Event()
+            self.stopping = False
+            os.makedirs(os.path.dirname(log_file), exist_ok=True)
+            try:
+                if os.path.getsize(log_file) > 0:
+                    self.rotate()
+            except OSError:
+                pass
+            self.thread = threading.Thread(target=self.run, name="ccr-log-sink", daemon=True)
+            self.thread.start()
+
+        def write(self, line):
+            if len(self.buffer) == self.buffer.maxlen:
+                # The oldest line is about to be pushed out; bursts cost lines, not memory
+                self.dropped += 1
+            self.buffer.append(line)
+            if len(self.buffer) >= self.buffer.maxlen // 2:
+                self.wakeup.set()
+
+        def rotate(self):
+            for index in range(CCR_LOG_BACKUPS - 1, 0, -1):
+                source = f"{self.log_file}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_file}.{index + 1}")
+            if os.path.exists(self.log_file):
+                os.replace(self.log_file, f"{self.log_file}.1")
+            self.opened_at = time.time()
+
+        def flush(self):
+            lines = []
+            while self.buffer:
+                try:
+                    lines.append(self.buffer.popleft())
+                except IndexError:
+                    break
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                lines.insert(0, f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [WARNING] {dropped} log lines dropped (buffer full)\n")
+            if not lines:
+                return
+            try:
+                if time.time() - self.opened_at > CCR_LOG_ROTATE_SECONDS or (os.path.exists(self.log_file) and os.path.getsize(self.log_file) > CCR_LOG_MAX_BYTES):
+                    self.rotate()
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+            except Exception as e:
+                print(f"Error writing to log file: {e}")
+
+        def run(self):
+            while not self.stopping:
+                self.wakeup.wait(CCR_LOG_FLUSH_INTERVAL)
+                self.wakeup.clear()
+                self.flush()
+            self.flush()
+
+        def stop(self):
+            """Flush what is buffered and stop the writer thread"""
+            self.stopping = True
+            self.wakeup.set()
+            self.thread.join(timeout=5)
+
+    def ccr_read_debug_flag():
+        """One-time read of debug_mode from ccr_state.json, used until the manager has loaded its state"""
         try:
-            if os.path.exists(log_file):
-                with open(log_file, "w", encoding="utf-8") as f:
-                    f.write("")
-        except Exception as e:
-            print(f"Error clearing log file: {e}")
-    
-    ccr_clear_log()
+            if CCR_STATE_FILE.exists():
+                with CCR_STATE_FILE.open("r", encoding="utf-8") as f:
+                    return bool(json.load(f).get('debug_mode', False))
+        except Exception:
+            pass
+        return False
+
+    # A reload creates a new sink; the previous script instance's sink is flushed and stopped first
+    if getattr(bot, '_ccr_log_sink', None):
+        bot._ccr_log_sink.stop()
+    ccr_log_sink = CcrLogSink(CCR_LOG_FILE, debug_mode=ccr_read_debug_flag())
+    bot._ccr_log_sink = ccr_log_sink
 
     def ccr_parse_time_to_seconds(time_str):
         if not time_str or not isinstance(time_str, str):
@@ -68,38 +182,142 @@ def custom_command_runner_script():
             return None
         return str(channel_id)
 
-    def ccr_is_within_timer(timer_config):
-        """Check if current time is within the configured timer"""
+    def ccr_command_key(channel_id, command_name):
+        """Key used for a command in state["last_used"] and in the scheduler"""
+        return f"{channel_id}-{command_name}"
+
+    CCR_DISCORD_EPOCH_MS = 1420070400000
+    ccr_nonce_counter = [0]
+
+    def ccr_new_interaction_nonce():
+        """Snowflake-shaped interaction nonce; the counter keeps nonces unique within the same millisecond"""
+        ccr_nonce_counter[0] = (ccr_nonce_counter[0] + 1) & 0x3FFFFF
+        return str(((int(time.time() * 1000) - CCR_DISCORD_EPOCH_MS) << 22) | ccr_nonce_counter[0])
+
+    CCR_WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    ccr_compiled_timers = {}
+
+    def ccr_compile_timer(timer_config):
+        """Compile a timer config into next_open(ts): the first timestamp >= ts at which the
+        timer window is open, or None if it never opens. Compiled functions are cached per config."""
         if not timer_config or not timer_config.get("enabled", False):
-            return True
-        
-        now = datetime.now()
-        current_time = now.time()
-        current_weekday = now.weekday()
-        
-        allowed_days = timer_config.get("days", [])
-        if allowed_days:
-            weekday_names = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-            current_day_name = weekday_names[current_weekday]
-            if current_day_name not in [day.lower() for day in allowed_days]:
-                return False
+            return lambda ts: ts
         
+        days = tuple(sorted(str(day).lower() for day in timer_config.get("days", []) or []))
         start_time_str = timer_config.get("start_time")
         end_time_str = timer_config.get("end_time")
+        cache_key = (days, start_time_str, end_time_str)
+        if cache_key in ccr_compiled_timers:
+            return ccr_compiled_timers[cache_key]
+        
+        allowed_weekdays = {i for i, name in enumerate(CCR_WEEKDAY_NAMES) if name in days} if days else set(range(7))
         
+        # Open intervals within an allowed day, in seconds since midnight (both ends inclusive)
+        intervals = [(0, 86400)]
         if start_time_str and end_time_str:
             try:
                 start_time = datetime_time.fromisoformat(start_time_str)
                 end_time = datetime_time.fromisoformat(end_time_str)
-                
+                start_s = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+                end_s = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
                 if start_time <= end_time:
-                    return start_time <= current_time <= end_time
+                    intervals = [(start_s, end_s)]
                 else:
-                    return current_time >= start_time or current_time <= end_time
+                    # Overnight window: the early-morning part belongs to the day it falls on
+                    intervals = [(0, end_s), (start_s, 86400)]
             except ValueError:
-                return True
+                pass
         
-        return True
+        def next_open(ts):
+            if not allowed_weekdays:
+                return None
+            moment = datetime.fromtimestamp(ts)
+            midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+            for day_offset in range(8):
+                day_start = midnight + timedelta(days=day_offset)
+                if day_start.weekday() not in allowed_weekdays:
+                    continue
+                for start_s, end_s in intervals:
+                    if day_start + timedelta(seconds=end_s) < moment:
+                        continue
+                    open_at = day_start + timedelta(seconds=start_s)
+                    return ts if open_at <= moment else open_at.timestamp()
+            return None
+        
+        ccr_compiled_timers[cache_key] = next_open
+        return next_open
+
+    def ccr_is_within_timer(timer_config, now=None):
+        """Check if current time is within the configured timer"""
+        now = time.time() if now is None else now
+        return ccr_compile_timer(timer_config)(now) == now
+
+    class CcrClock:
+        """Wall clock used by the scheduler; the dry run swaps in a CcrVirtualClock"""
+        def time(self):
+            return time.time()
+
+        def now(self):
+            return datetime.fromtimestamp(self.time())
+
+        async def sleep(self, delay):
+            await asyncio.sleep(delay)
+
+        async def wait_for(self, awaitable, timeout):
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+
+    class CcrVirtualClock(CcrClock):
+        """Discrete-event clock: sleepers wait on futures and run_until() jumps time from one
+        wake-up to the next once every task has gone idle, so hours pass in milliseconds."""
+        def __init__(self, start_time):
+            self.current = start_time
+            self.timers = []
+            self.timer_seq = 0
+
+        def time(self):
+            return self.current
+
+        def ccr_timer(self, delay):
+            future = asyncio.get_running_loop().create_future()
+            self.timer_seq += 1
+            heapq.heappush(self.timers, (self.current + max(0.0, delay or 0.0), self.timer_seq, future))
+            return future
+
+        async def sleep(self, delay):
+            await self.ccr_timer(delay)
+
+        async def wait_for(self, awaitable, timeout):
+            if timeout is None:
+                return await awaitable
+            task = asyncio.ensure_future(awaitable)
+            timer = self.ccr_timer(timeout)
+            try:
+                done, _ = await asyncio.wait((task, timer), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                timer.cancel()
+                if not task.done():
+                    task.cancel()
+            if task in done:
+                return task.result()
+            raise asyncio.TimeoutError()
+
+        async def ccr_settle(self):
+            # Every sleeper here waits on the virtual clock, so a few loop turns let woken tasks run to their next wait
+            for _ in range(CCR_DRYRUN_SETTLE_TURNS):
+                await asyncio.sleep(0)
+
+        async def run_until(self, end_time):
+            """Advance virtual time to end_time, waking sleepers in order"""
+            while True:
+                await self.ccr_settle()
+                while self.timers and self.timers[0][2].done():
+                    heapq.heappop(self.timers)
+                if not self.timers or self.timers[0][0] > end_time:
+                    self.current = end_time
+                    return
+                wake_at, _, future = heapq.heappop(self.timers)
+                self.current = max(self.current, wake_at)
+                future.set_result(None)
 
     async def ccr_load_json_data(file_path, default_data):
         if not file_path.exists():
@@ -126,51 +344,130 @@ def custom_command_runner_script():
                 return str(obj)
 
     async def ccr_save_json_data(file_path, data):
+        """Write data as JSON atomically; returns True once the file is in place, False if the write failed"""
         def _blocking_save():
             try:
-                with file_path.open("w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=4, cls=SafeJSONEncoder)
+                # Write to a temp file and swap it in so a crash never leaves a half-written file.
+                # The temp name is unique per call, so concurrent saves of one file can't write into each other.
+                fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=file_path.name + ".", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(data, f, indent=4, cls=SafeJSONEncoder)
+                    os.replace(tmp_path, file_path)
+                except BaseException:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                    raise
+                return True
             except Exception as e:
                 print(f"[CommandRunner] Error saving {file_path.name}: {e}")
+                return False
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _blocking_save)
+
+    async def ccr_append_journal(file_path, record):
+        """Append one JSON record to a journal file and flush it to disk"""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        def _blocking_append():
+            try:
+                with file_path.open("a", encoding="utf-8") as f:
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception as e:
+                print(f"[CommandRunner] Error appending to {file_path.name}: {e}")
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _blocking_append)
+
+    async def ccr_read_journal(file_path):
+        """Read all complete records of a journal file; a torn last line is ignored"""
+        def _blocking_read():
+            records = []
+            try:
+                with file_path.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            records.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+            except FileNotFoundError:
+                pass
+            return records
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _blocking_read)
+
+    async def ccr_truncate_journal(file_path):
+        def _blocking_truncate():
+            try:
+                with file_path.open("w", encoding="utf-8"):
+                    pass
+            except Exception as e:
+                print(f"[CommandRunner] Error truncating {file_path.name}: {e}")
         
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, _blocking_save)
+        await loop.run_in_executor(None, _blocking_truncate)
     
+    def ccr_get_manager():
+        return getattr(bot, '_command_runner_manager', None)
+
+    CCR_DISCORD_API_BASE = "https://discord.com/api"
+
+    def ccr_api_base_allowed(url):
+        """Requests carry the user token, so a base must be https, or plain http on a loopback host"""
+        try:
+            parts = urlsplit(url)
+            host = parts.hostname or ""
+        except ValueError:
+            return False
+        if parts.scheme == "https":
+            return bool(host)
+        if parts.scheme != "http":
+            return False
+        if host == "localhost":
+            return True
+        try:
+            return ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            return False
+
+    def ccr_api_url(path):
+        """URL of a Discord API path under the configured base (state["api_base_url"]), e.g. a local stub server"""
+        manager = ccr_get_manager()
+        base = (manager.state.get("api_base_url") if manager and isinstance(manager.state, dict) else None) or CCR_DISCORD_API_BASE
+        if not ccr_api_base_allowed(base):
+            # A hand-edited state file must not send the token somewhere `ccr api` would refuse
+            base = CCR_DISCORD_API_BASE
+        return base.rstrip("/") + path
+
+    def ccr_rebase_api_url(url):
+        """Point a stored discord.com API URL (like the log webhook) at the configured base"""
+        if url.startswith(CCR_DISCORD_API_BASE + "/"):
+            return ccr_api_url(url[len(CCR_DISCORD_API_BASE):])
+        return url
+
     async def ccr_disable_command_automatically(channel_id, command_name, bot_id, debug_mode=False):
         """Disable a command automatically when it's not found"""
         try:
-            channels_cfg = await ccr_load_json_data(CCR_CHANNELS_FILE, {"channels": {}})
+            manager = ccr_get_manager()
+            if not manager:
+                return False
             
             channel_id = ccr_channel_id_string(channel_id)
-            if channel_id in channels_cfg.get("channels", {}):
-                channel_commands = channels_cfg["channels"][channel_id].get("commands", [])
-                
-                # Find and disable the specific command
-                command_found = False
-                for cmd in channel_commands:
-                    cmd_name = cmd.get("name", "")
-                    cmd_main = cmd_name.split()[0] if cmd_name else ""
-                    cmd_bot_id = cmd.get("bot_id")
-                    
-                    if (cmd_main == command_name and 
-                        str(cmd_bot_id) == str(bot_id) and 
-                        cmd.get("command_type") == "slash"):
-                        
-                        cmd["enabled"] = False
-                        command_found = True
-                        break
-                
-                await ccr_save_json_data(CCR_CHANNELS_FILE, channels_cfg)
-                
-                if hasattr(bot, '_command_runner_manager') and bot._command_runner_manager:
-                    manager = bot._command_runner_manager
-                    if hasattr(manager, 'channels_cfg'):
-                        manager.channels_cfg = channels_cfg
-                
-                if command_found:
+            if channel_id in manager.channels_cfg.get("channels", {}):
+                cmd = manager.ccr_find_slash_command(channel_id, command_name, bot_id)
+                if cmd:
+                    cmd["enabled"] = False
+                    manager.ccr_record_stat(ccr_command_key(channel_id, cmd.get("name", command_name)), bot_id, outcome="auto_disabled")
+                    manager.ccr_trigger_reschedule(channel_id, cmd)
+                    manager.ccr_schedule_channels_save()
                     ccr_log_to_file(f"🔴 AUTO-DISABLED: Command '{command_name}' has been automatically disabled" + "\n", debug_mode=debug_mode, important=True)
                 
-                return command_found
+                return cmd is not None
             else:
                 ccr_log_to_file(f"❌ AUTO-DISABLE: Channel '{channel_id}' not found in configuration", level="ERROR", debug_mode=debug_mode)
         except Exception as e:
@@ -179,100 +476,90 @@ def custom_command_runner_script():
         return False
     
     async def ccr_save_slash_type_to_config(channel_id, command_name, bot_id, command_type, debug_mode=False):
-        """Save slash command type directly to ccr_channels.json"""
+        """Save slash command type to the in-memory config; persisted in the background"""
         try:
-            channels_cfg = await ccr_load_json_data(CCR_CHANNELS_FILE, {"channels": {}})
-            
-            if channel_id in channels_cfg.get("channels", {}):
-                channel_commands = channels_cfg["channels"][channel_id].get("commands", [])
-                
-                # Find and update the specific command
-                for i, cmd in enumerate(channel_commands):
-                    cmd_name = cmd.get("name", "")
-                    cmd_main = cmd_name.split()[0] if cmd_name else ""
-                    cmd_bot_id = cmd.get("bot_id")
-                    cmd_type = cmd.get("command_type")
-                    
-                    if (cmd_main == command_name and 
-                        str(cmd_bot_id) == str(bot_id) and 
-                        cmd_type == "slash"):
-                        cmd["slash_type"] = command_type
-                        ccr_log_to_file(f"Updated slash_type for command '{cmd_name}' (main: '{command_name}') -> {command_type}", level="SUCCESS", debug_mode=debug_mode)
-                        break
-                await ccr_save_json_data(CCR_CHANNELS_FILE, channels_cfg)
+            manager = ccr_get_manager()
+            cmd = manager.ccr_find_slash_command(channel_id, command_name, bot_id) if manager else None
+            if cmd:
+                cmd["slash_type"] = command_type
+                manager.ccr_schedule_channels_save()
+                ccr_log_to_file(f"Updated slash_type for command '{cmd.get('name', '')}' (main: '{command_name}') -> {command_type}", level="SUCCESS", debug_mode=debug_mode)
         except Exception as e:
             ccr_log_to_file(f"Error saving slash_type to config: {e}", debug_mode=debug_mode)
     
     async def ccr_save_execution_type_to_config(channel_id, command_name, bot_id, execution_type, debug_mode=False):
-        """Save execution type (direct/api) to ccr_channels.json"""
+        """Save execution type (direct/api) to the in-memory config; persisted in the background"""
         try:
-            channels_cfg = await ccr_load_json_data(CCR_CHANNELS_FILE, {"channels": {}})
-            
-            if channel_id in channels_cfg.get("channels", {}):
-                channel_commands = channels_cfg["channels"][channel_id].get("commands", [])
-                
-                # Find and update the specific command
-                for i, cmd in enumerate(channel_commands):
-                    cmd_name = cmd.get("name", "")
-                    cmd_main = cmd_name.split()[0] if cmd_name else ""
-                    cmd_bot_id = cmd.get("bot_id")
-                    cmd_type = cmd.get("command_type")
-                    
-                    if (cmd_main == command_name and 
-                        str(cmd_bot_id) == str(bot_id) and 
-                        cmd_type == "slash"):
-                        current_execution_type = cmd.get("execution_type")
-                        if current_execution_type != execution_type:
-                            cmd["execution_type"] = execution_type
-                            ccr_log_to_file(f"Updated execution_type for command '{cmd_name}' (main: '{command_name}') -> {execution_type}", level="SUCCESS", debug_mode=debug_mode)
-                        else:
-                            ccr_log_to_file(f"Execution_type for command '{cmd_name}' already set to {execution_type}, no update needed", debug_mode=debug_mode)
-                        break
+            manager = ccr_get_manager()
+            cmd = manager.ccr_find_slash_command(channel_id, command_name, bot_id) if manager else None
+            if cmd:
+                current_execution_type = cmd.get("execution_type")
+                if current_execution_type != execution_type:
+                    cmd["execution_type"] = execution_type
+                    manager.ccr_schedule_channels_save()
+                    ccr_log_to_file(f"Updated execution_type for command '{cmd.get('name', '')}' (main: '{command_name}') -> {execution_type}", level="SUCCESS", debug_mode=debug_mode)
                 else:
-                    ccr_log_to_file(f"Command '{command_name}' with bot_id {bot_id} not found in channel {channel_id} for execution_type update", debug_mode=debug_mode)
-                await ccr_save_json_data(CCR_CHANNELS_FILE, channels_cfg)
+                    ccr_log_to_file(f"Execution_type for command '{cmd.get('name', '')}' already set to {execution_type}, no update needed", debug_mode=debug_mode)
+            else:
+                ccr_log_to_file(f"Command '{command_name}' with bot_id {bot_id} not found in channel {channel_id} for execution_type update", debug_mode=debug_mode)
         except Exception as e:
             ccr_log_to_file(f"Error saving execution_type to config: {e}", debug_mode=debug_mode)
     
-    async def ccr_fetch_global_command(bot_id, command_name, debug_mode=False):
-        """Fetch a specific global command for a bot"""
+    class MockSlashCmd:
+        """Stand-in for a slash command known only from its raw definition (not directly callable)"""
+        def __init__(self, cmd_data):
+            self.id = cmd_data['id']
+            self.version = cmd_data['version']
+            self.description = cmd_data.get('description', '')
+            self.options = cmd_data.get('options', [])
+            self.name = cmd_data.get('name', '')
+            self.type = cmd_data.get('type', 1)
+
+    async def ccr_download_global_commands(bot_id, debug_mode=False):
+        """Download a bot's global application commands as a name -> definition dict (None on failure)"""
+        headers = {
+            "Authorization": bot.http.token,
+            "Content-Type": "application/json",
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        }
+        
+        session = ccr_get_manager().ccr_get_http_session()
+        url = ccr_api_url(f"/v9/applications/{bot_id}/commands")
+        async with session.get(url, headers=headers) as resp:
+            if resp.status != 200:
+                ccr_log_to_file(f"Global command list for bot {bot_id} returned status {resp.status}", debug_mode=debug_mode)
+                return None
+            global_commands = await resp.json()
+        
+        available_commands = [cmd.get('name', 'unknown') for cmd in global_commands]
+        ccr_log_to_file(f"Available global commands for bot {bot_id}: {available_commands}", debug_mode=debug_mode)
+        return {cmd.get('name'): cmd for cmd in global_commands if cmd.get('name')}
+
+    async def ccr_fetch_global_command(bot_id, command_name, debug_mode=False, raise_errors=False):
+        """Fetch a specific global command for a bot. With raise_errors, a failed list download
+        raises instead of returning None, so callers can tell it apart from a missing command."""
         try:
-            headers = {
-                "Authorization": bot.http.token,
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
+            definition_cache = ccr_get_manager().slash_definitions
+            global_commands = await definition_cache.get_global_commands(bot_id, lambda: ccr_download_global_commands(bot_id, debug_mode))
+            if global_commands is None:
+                if raise_errors:
+                    raise RuntimeError(f"global command list for bot {bot_id} could not be downloaded")
+                return None
             
-            # Fetch global commands for the application
-            async with aiohttp.ClientSession() as session:
-                url = f"https://discord.com/api/v9/applications/{bot_id}/commands"
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status == 200:
-                        global_commands = await resp.json()
-                        available_commands = [cmd.get('name', 'unknown') for cmd in global_commands]
-                        ccr_log_to_file(f"Available global commands for bot {bot_id}: {available_commands}", debug_mode=debug_mode)
-                        
-                        # Find the command we're looking for
-                        for cmd in global_commands:
-                            if cmd.get('name') == command_name:
-                                class MockSlashCmd:
-                                    def __init__(self, cmd_data):
-                                        self.id = cmd_data['id']
-                                        self.version = cmd_data['version']
-                                        self.description = cmd_data.get('description', '')
-                                        self.options = cmd_data.get('options', [])
-                                        self.name = cmd_data.get('name', '')
-                                        self.type = cmd_data.get('type', 1)
-                                
-                                option_count = len(cmd.get('options', []))
-                                ccr_log_to_file(f"Found global command '{command_name}' for bot {bot_id} ({option_count} options available)", debug_mode=debug_mode)
-                                return MockSlashCmd(cmd)
-                        
-                        if debug_mode:
-                            ccr_log_to_file(f"Command '{command_name}' not found in global commands. Available commands: {available_commands}", debug_mode=debug_mode)
-                                
+            # Find the command we're looking for
+            cmd = global_commands.get(command_name)
+            if cmd:
+                option_count = len(cmd.get('options', []))
+                ccr_log_to_file(f"Found global command '{command_name}' for bot {bot_id} ({option_count} options available)", debug_mode=debug_mode)
+                return MockSlashCmd(cmd)
+            
+            if debug_mode:
+                ccr_log_to_file(f"Command '{command_name}' not found in global commands. Available commands: {list(global_commands)}", debug_mode=debug_mode)
+                            
         except Exception as e:
             ccr_log_to_file(f"Error fetching global commands: {e}", debug_mode=debug_mode)
+            if raise_errors:
+                raise
         
         return None
 
@@ -282,54 +569,146 @@ def custom_command_runner_script():
         except (ValueError, TypeError, AttributeError):
             return default
 
+    def ccr_safe_float(value, default=0.0):
+        try:
+            return float(str(value).strip())
+        except (ValueError, TypeError, AttributeError):
+            return default
+
     def ccr_get_default_state():
         return {
             "is_running": False, "webhook_url": None,
             "console_logs_enabled": False, "last_used": {},
             "debug_mode": False, 
-            "reuse_bot_names": True
+            "reuse_bot_names": True,
+            "max_concurrency": 3,
+            "api_base_url": None
         }
 
+    # --- Tracing ---
+    CCR_TRACE_MAX_EVENTS = 20000
+
+    class CcrNoopSpan:
+        """Returned when neither tracing nor timing is wanted; every operation is a no-op"""
+        __slots__ = ()
+        duration = 0.0
+
+        def end(self, **args):
+            return self
+
+        def set(self, **args):
+            return self
+
+        def elapsed(self):
+            return 0.0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+    CCR_NOOP_SPAN = CcrNoopSpan()
+
+    class CcrSpan:
+        """One timed stage; recorded as a Chrome trace complete event when the tracer is enabled"""
+        __slots__ = ("tracer", "name", "track", "args", "start", "duration", "ended")
+
+        def __init__(self, tracer, name, track, args):
+            self.tracer = tracer
+            self.name = name
+            self.track = track
+            self.args = args
+            self.start = time.perf_counter()
+            self.duration = 0.0
+            self.ended = False
+
+        def elapsed(self):
+            return self.duration if self.ended else time.perf_counter() - self.start
+
+        def set(self, **args):
+            """Attach extra fields to the exported trace event"""
+            self.args.update(args)
+            return self
+
+        def end(self, **args):
+            if not self.ended:
+                self.ended = True
+                self.duration = time.perf_counter() - self.start
+                if args:
+                    self.args.update(args)
+                if self.tracer.enabled:
+                    self.tracer.record(self)
+            return self
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            if exc_type is not None and exc_type is not asyncio.CancelledError:
+                self.end(error=str(exc) or exc_type.__name__)
+            else:
+                self.end()
+            return False
+
+    class CcrTracer:
+        """Stage spans for command execution, exportable as Chrome trace JSON (chrome://tracing, Perfetto).
+        span() returns a shared no-op object unless tracing is on or the caller asks for timing."""
+
+        def __init__(self, max_events=CCR_TRACE_MAX_EVENTS):
+            self.enabled = False
+            self.events = deque(maxlen=max_events)
+            self.tracks = {}
+            self.origin = time.perf_counter()
+            self.wall_origin = time.time()
+
+        def span(self, name, track=0, timed=False, **args):
+            if not (self.enabled or timed):
+                return CCR_NOOP_SPAN
+            return CcrSpan(self, name, track, args)
+
+        def record(self, span):
+            # Chrome trace viewers want small integer thread ids; channel ids are mapped to one track each
+            tid = self.tracks.setdefault(span.track, len(self.tracks) + 1)
+            self.events.append({
+                "name": span.name, "cat": "ccr", "ph": "X", "pid": 1, "tid": tid,
+                "ts": round((span.start - self.origin) * 1e6), "dur": round(span.duration * 1e6),
+                "args": span.args
+            })
+
+        def clear(self):
+            self.events.clear()
+            self.tracks = {}
+
+        def export(self):
+            track_names = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": f"channel {track}" if track else "runner"}}
+                           for track, tid in self.tracks.items()]
+            return {"traceEvents": track_names + list(self.events), "displayTimeUnit": "ms",
+                    "otherData": {"started": datetime.fromtimestamp(self.wall_origin).isoformat()}}
+
+    ccr_tracer = CcrTracer()
+
     # --- Custom Slash Command Execution Function ---
     def ccr_log_to_file(message, level="INFO", debug_mode=None, important=False):
         """Log messages to file with different levels of detail
         Args:
             message: Log message
             level: Log level (INFO, ERROR, SUCCESS, etc.)
-            debug_mode: Debug mode state (auto-loaded if None)
+            debug_mode: Debug mode state (cached manager value if None)
             important: If True, always log regardless of debug_mode
         """
-        # Load debug_mode from state if not explicitly provided
+        # Fall back to the sink's cached debug flag when not explicitly provided
         if debug_mode is None:
-            try:
-                # Load state data
-                state_file = CCR_STATE_FILE
-                if state_file.exists():
-                    with state_file.open("r", encoding="utf-8") as f:
-                        state_data = json.load(f)
-                    debug_mode = state_data.get('debug_mode', False)
-                else:
-                    debug_mode = False
-            except:
-                debug_mode = False
+            debug_mode = ccr_log_sink.debug_mode
     
         if not important and debug_mode is False:
             return
-            
-        log_dir = os.path.join(getScriptsPath(), "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        log_file = os.path.join(log_dir, "ccr.log")
         
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        try:
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(f"[{timestamp}] [{level}] {message}\n")
-        except Exception as e:
-            print(f"Error writing to log file: {e}")
+        ccr_log_sink.write(f"[{timestamp}] [{level}] {message}\n")
     
     def ccr_convert_options_to_dict(options):
-        """Convert Option objects to dictionaries for JSON serialization"""
+        """Convert Option objects to dictionaries for JSON serialization, with plain int types"""
         if not options:
             return []
         
@@ -338,41 +717,401 @@ def custom_command_runner_script():
             if hasattr(option, 'name'):
                 option_dict = {
                     'name': option.name,
-                    'type': option.type,
+                    'type': ccr_option_type(option),
                     'description': getattr(option, 'description', ''),
                     'required': getattr(option, 'required', False)
                 }
                 if hasattr(option, 'options') and option.options:
                     option_dict['options'] = ccr_convert_options_to_dict(option.options)
+                if getattr(option, 'choices', None):
+                    option_dict['choices'] = [
+                        choice if isinstance(choice, dict) else {'name': getattr(choice, 'name', ''), 'value': getattr(choice, 'value', '')}
+                        for choice in option.choices
+                    ]
                 result.append(option_dict)
             else:
                 result.append(option)
         
         return result
 
-    async def execute_slash_command_custom(channel, bot_id, command_name, debug_mode=False, **kwargs):
+    CCR_SLASH_DEFINITION_TTL = 6 * 3600
+    CCR_GLOBAL_COMMANDS_TTL = 30 * 60
+    # How long a "command not found" lookup result is reused before searching again
+    CCR_SLASH_NEGATIVE_TTL = 10 * 60
+    # Definitions in ccr_slash_cache.json older than this are not loaded on restart
+    CCR_SLASH_CACHE_MAX_AGE = 7 * 86400
+    # Interaction errors meaning the cached id/version no longer matches the bot's command
+    CCR_STALE_DEFINITION_MARKERS = ("10063", "unknown application command", "invalid_version", "outdated")
+
+    def ccr_is_stale_definition_error(error_text):
+        error_text = str(error_text).lower()
+        return any(marker in error_text for marker in CCR_STALE_DEFINITION_MARKERS)
+
+    class SlashDefinitionCache:
+        """Resolved slash command definitions keyed by (bot_id, guild_id, command name).
+        Entries hold the id, version, options tree and scope, plus the command object itself,
+        and expire after `ttl` seconds or when an interaction reports them as stale.
+        Whole per-bot global command lists are cached as well, sharing one expiry per bot.
+        Definitions are persisted to ccr_slash_cache.json; entries loaded from there are marked
+        "persisted" (their command is a MockSlashCmd) until a background revalidation replaces them.
+        Commands known not to exist are remembered for `negative_ttl` seconds under the same keys."""
+        def __init__(self, ttl=CCR_SLASH_DEFINITION_TTL, global_ttl=CCR_GLOBAL_COMMANDS_TTL, negative_ttl=CCR_SLASH_NEGATIVE_TTL):
+            self.ttl = ttl
+            self.global_ttl = global_ttl
+            self.negative_ttl = negative_ttl
+            self.entries = {}
+            # (bot_id, guild_id, name) -> expiry of a "not found" result
+            self.missing = {}
+            self.global_lists = {}
+            self.global_fetches = {}
+            self.revalidating = set()
+            # Called after entries change, so the owner can schedule a save
+            self.on_change = None
+
+        def ccr_changed(self):
+            if self.on_change:
+                self.on_change()
+
+        @staticmethod
+        def make_key(bot_id, guild_id, command_name):
+            return (str(bot_id), str(guild_id) if guild_id else "DM", command_name)
+
+        def get(self, bot_id, guild_id, command_name):
+            key = self.make_key(bot_id, guild_id, command_name)
+            entry = self.entries.get(key)
+            if entry and entry["expires"] <= time.time():
+                del self.entries[key]
+                return None
+            return entry
+
+        def put(self, bot_id, guild_id, command_name, slash_cmd, scope):
+            entry = {
+                "id": str(slash_cmd.id),
+                "version": str(getattr(slash_cmd, 'version', '1')),
+                "name": command_name,
+                "type": getattr(slash_cmd, 'type', 1),
+                "options": ccr_convert_options_to_dict(getattr(slash_cmd, 'options', [])),
+                "scope": scope,
+                "command": slash_cmd,
+                "fetched_at": time.time(),
+                "expires": time.time() + self.ttl
+            }
+            key = self.make_key(bot_id, guild_id, command_name)
+            self.entries[key] = entry
+            self.missing.pop(key, None)
+            self.ccr_changed()
+            return entry
+
+        def mark_missing(self, bot_id, guild_id, command_name):
+            self.missing[self.make_key(bot_id, guild_id, command_name)] = time.time() + self.negative_ttl
+
+        def is_missing(self, bot_id, guild_id, command_name):
+            key = self.make_key(bot_id, guild_id, command_name)
+            expires = self.missing.get(key)
+            if expires is None:
+                return False
+            if expires <= time.time():
+                del self.missing[key]
+                return False
+            return True
+
+        def forget_missing(self, bot_id, command_name):
+            """Drop the "not found" results for a bot's command in every guild; returns how many were dropped"""
+            keys = [key for key in self.missing if key[0] == str(bot_id) and key[2] == command_name]
+            for key in keys:
+                del self.missing[key]
+            return len(keys)
+
+        def has_global_list(self, bot_id):
+            """True while a downloaded global command list for the bot is cached and unexpired"""
+            cached = self.global_lists.get(str(bot_id))
+            return bool(cached) and cached["expires"] > time.time()
+
+        def invalidate(self, bot_id, guild_id, command_name):
+            # The bot's global list may hold the same stale definition
+            self.global_lists.pop(str(bot_id), None)
+            removed = self.entries.pop(self.make_key(bot_id, guild_id, command_name), None) is not None
+            if removed:
+                self.ccr_changed()
+            return removed
+
+        def clear(self):
+            self.entries.clear()
+            self.global_lists.clear()
+            self.missing.clear()
+            self.ccr_changed()
+
+        def export(self):
+            """Compact JSON form: [bot_id, guild_id, name, id, version, type, scope, fetched_at, options] per definition"""
+            now = time.time()
+            return {"version": 1, "definitions": [
+                [key[0], key[1], key[2], entry["id"], entry["version"], entry["type"], entry["scope"], entry["fetched_at"], entry["options"]]
+                for key, entry in self.entries.items() if entry["expires"] > now
+            ]}
+
+        def load(self, data):
+            """Restore exported definitions; they stay usable for one ttl and are revalidated on first use"""
+            now = time.time()
+            loaded = 0
+            for record in (data.get("definitions") or []) if isinstance(data, dict) else []:
+                try:
+                    bot_id, guild_id, name, cmd_id, version, cmd_type, scope, fetched_at, options = record
+                except (TypeError, ValueError):
+                    continue
+                if now - ccr_safe_float(fetched_at) > CCR_SLASH_CACHE_MAX_AGE:
+                    continue
+                self.entries[(bot_id, guild_id, name)] = {
+                    "id": cmd_id, "version": version, "name": name, "type": cmd_type, "options": options, "scope": scope,
+                    "command": MockSlashCmd({"id": cmd_id, "version": version, "name": name, "type": cmd_type, "options": options}),
+                    "fetched_at": fetched_at, "expires": now + self.ttl, "persisted": True
+                }
+                loaded += 1
+            return loaded
+
+        async def get_global_commands(self, bot_id, fetch):
+            """Return the bot's cached name -> definition dict, calling `fetch` on a miss.
+            Concurrent misses for the same bot share a single in-flight request."""
+            key = str(bot_id)
+            cached = self.global_lists.get(key)
+            if cached and cached["expires"] > time.time():
+                return cached["commands"]
+            
+            pending = self.global_fetches.get(key)
+            if pending is None:
+                async def _fetch_and_store():
+                    try:
+                        commands = await fetch()
+                        if commands is not None:
+                            self.global_lists[key] = {"commands": commands, "expires": time.time() + self.global_ttl}
+                        return commands
+                    finally:
+                        self.global_fetches.pop(key, None)
+                pending = asyncio.ensure_future(_fetch_and_store())
+                self.global_fetches[key] = pending
+            # Shielded so one cancelled caller doesn't abort the fetch for the others
+            return await asyncio.shield(pending)
+
+    def ccr_channel_guild_id(channel):
+        return channel.guild.id if getattr(channel, 'guild', None) else None
+
+    async def ccr_resolve_slash_command(channel, bot_id, main_command, cached_slash_type=None, debug_mode=False):
+        """Fetch a slash command definition, trying the remembered scope first.
+        Returns (slash_cmd, command_type, confirmed_missing) where command_type is 'server', 'global' or None.
+        confirmed_missing is True only when both scopes answered and the bot's global list is still fresh."""
+        slash_cmd = None
+        command_type = None
+        confirmed_missing = False
+        
+        # If we have cached slash_type, try the cached type first
+        if cached_slash_type:
+            ccr_log_to_file(f"Found cached slash_type for '{main_command}': {cached_slash_type}", debug_mode=debug_mode)
+            
+            if cached_slash_type == 'server':
+                slash_cmd = await fetchSlashCommand(channel, bot_id, main_command)
+
+                if slash_cmd:
+                    command_type = 'server'
+                    ccr_log_to_file(f"✅ Found command '{main_command}' in server for bot {bot_id} (from cache)", debug_mode=debug_mode)
+            elif cached_slash_type == 'global':
+                # Try global commands directly
+                slash_cmd = await ccr_fetch_global_command(bot_id, main_command, debug_mode)
+                if slash_cmd:
+                    command_type = 'global'
+                    ccr_log_to_file(f"✅ Found command '{main_command}' as global for bot {bot_id} (from cache)", debug_mode=debug_mode)
+        
+        # If cache miss or cached command not found, do full search
+        if not slash_cmd:
+            ccr_log_to_file(f"Cache miss or cached command not found, racing server and global lookups for '{main_command}'", debug_mode=debug_mode)
+            slash_cmd, command_type = await ccr_race_slash_lookups(channel, bot_id, main_command, debug_mode)
+            if slash_cmd:
+                ccr_log_to_file(f"✅ Found command '{main_command}' in {command_type} scope for bot {bot_id}", debug_mode=debug_mode)
+            else:
+                # The race raises unless both scopes answered; the list can still have expired in the meantime
+                confirmed_missing = ccr_get_manager().slash_definitions.has_global_list(bot_id)
+        
+        return slash_cmd, command_type, confirmed_missing
+
+    async def ccr_race_slash_lookups(channel, bot_id, main_command, debug_mode=False):
+        """Run the server and global lookups concurrently. The first one to find the command wins
+        and the other is cancelled; returns (slash_cmd, 'server' | 'global'), or (None, None) only when
+        both scopes answered without it. If a lookup failed and the other didn't find the command,
+        the failure is raised: the command may still exist, so it must not be treated as missing."""
+        lookups = {
+            asyncio.ensure_future(fetchSlashCommand(channel, bot_id, main_command)): 'server',
+            asyncio.ensure_future(ccr_fetch_global_command(bot_id, main_command, debug_mode, raise_errors=True)): 'global'
+        }
+        errors = {}
+        pending = set(lookups)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # On a tie the server scope wins, as it did when the lookups ran in sequence
+                for task in sorted(done, key=lambda task: lookups[task] != 'server'):
+                    if task.exception() is not None:
+                        errors[lookups[task]] = task.exception()
+                        ccr_log_to_file(f"{lookups[task].capitalize()} lookup for '{main_command}' (bot {bot_id}) failed: {task.exception()}", level="ERROR", debug_mode=debug_mode)
+                    elif task.result():
+                        return task.result(), lookups[task]
+        finally:
+            # The global list download is shielded in SlashDefinitionCache, so it still completes for other callers
+            for task in pending:
+                task.cancel()
+        if errors:
+            raise errors.get('server') or errors['global']
+        return None, None
+
+    async def ccr_get_slash_definition(channel, bot_id, main_command, command_config=None, debug_mode=False, revalidate=True):
+        """Definition lookup through the manager's SlashDefinitionCache, shared by execution and the start-up warm-up.
+        A hit on a disk-cached definition starts a background revalidation unless revalidate is False.
+        Returns (slash_cmd, command_type, cached_definition, cache_hit)."""
+        manager = ccr_get_manager()
+        definition_cache = manager.slash_definitions if manager else None
+        guild_id = ccr_channel_guild_id(channel)
+        cached_definition = definition_cache.get(bot_id, guild_id, main_command) if definition_cache else None
+        if cached_definition:
+            if cached_definition.get("persisted") and manager and revalidate:
+                manager.ccr_revalidate_slash_definition(channel, bot_id, main_command, command_config, debug_mode)
+            return cached_definition["command"], cached_definition["scope"], cached_definition, True
+        if definition_cache and definition_cache.is_missing(bot_id, guild_id, main_command):
+            ccr_log_to_file(f"Skipping lookup for '{main_command}' (bot {bot_id}): not found within the last {definition_cache.negative_ttl // 60} min", debug_mode=debug_mode)
+            return None, None, None, False
+        
+        cached_slash_type = command_config.get("slash_type") if command_config else None
+        slash_cmd, command_type, confirmed_missing = await ccr_resolve_slash_command(channel, bot_id, main_command, cached_slash_type, debug_mode)
+        if slash_cmd and definition_cache:
+            cached_definition = definition_cache.put(bot_id, guild_id, main_command, slash_cmd, command_type)
+        elif definition_cache and confirmed_missing:
+            # Only a miss confirmed by both scopes is remembered; failed requests are retried next time
+            definition_cache.mark_missing(bot_id, guild_id, main_command)
+        if slash_cmd and command_type and command_config and command_type != cached_slash_type:
+            await ccr_save_slash_type_to_config(str(channel.id), main_command, bot_id, command_type, debug_mode)
+        return slash_cmd, command_type, cached_definition, False
+
+    def ccr_option_field(option, field, default=None):
+        """Read a field from either an Option object or a raw option dict"""
+        if isinstance(option, dict):
+            return option.get(field, default)
+        return getattr(option, field, default)
+
+    def ccr_option_type(option):
+        """Option type as an int, whether stored as an int or as a discord.py enum"""
+        option_type = ccr_option_field(option, 'type', 3)
+        return ccr_safe_int(getattr(option_type, 'value', option_type), 3)
+
+    def ccr_find_option(options, name, option_type=None):
+        for option in options or []:
+            if ccr_option_field(option, 'name') == name and (option_type is None or ccr_option_type(option) == option_type):
+                return option
+        return None
+
+    def ccr_build_argument_option(option_def, param_name, value):
+        """Match choices and coerce a configured argument to its option type"""
+        clean_value = str(value).strip('"\'')
+        final_value = clean_value
+        for choice in (ccr_option_field(option_def, 'choices') or []) if option_def else []:
+            choice_name = ccr_option_field(choice, 'name', '')
+            choice_value = ccr_option_field(choice, 'value', '')
+            if clean_value == choice_name or clean_value == choice_value:
+                final_value = choice_value
+                break
+        
+        option_type = ccr_option_type(option_def) if option_def else 3  # STRING type by default
+        try:
+            if option_type == 4:  # INTEGER type
+                return {"type": option_type, "name": param_name, "value": int(float(final_value)) if '.' in str(final_value) else int(final_value)}
+            if option_type == 10:  # NUMBER type
+                return {"type": option_type, "name": param_name, "value": float(final_value)}
+        except (ValueError, TypeError):
+            return {"type": 3, "name": param_name, "value": str(final_value)}  # Fallback to STRING
+        if option_type == 5:  # BOOLEAN type
+            return {"type": option_type, "name": param_name, "value": str(final_value).lower() in ('true', '1', 'yes', 'on')}
+        # STRING, USER, MENTIONABLE and other types are sent as strings
+        return {"type": option_type, "name": param_name, "value": str(final_value)}
+
+    def ccr_compile_interaction_data(slash_cmd, command_name, kwargs):
+        """Build the `data` part of an interaction payload for a configured command.
+        'help 2' -> subcommand '2'; 'a b c' -> subcommand group 'b' with subcommand 'c'."""
+        command_parts = command_name.strip().split()
+        main_command = command_parts[0] if command_parts else command_name
+        subcommand = command_parts[1] if len(command_parts) > 1 else None
+        subcommand_group = command_parts[2] if len(command_parts) > 2 else None
+        
+        def argument_options(option_defs):
+            options = []
+            for key, value in kwargs.items():
+                # Handle parameter name mapping for specific commands
+                param_name = 'question' if main_command == '8ball' and key == 'pregunta' else key
+                options.append(ccr_build_argument_option(ccr_find_option(option_defs, param_name), param_name, value))
+            return options
+        
+        command_options = getattr(slash_cmd, 'options', []) or []
+        if subcommand and subcommand_group:
+            group_def = ccr_find_option(command_options, subcommand, 2)  # SUB_COMMAND_GROUP
+            subcommand_def = ccr_find_option(ccr_option_field(group_def, 'options', []), subcommand_group, 1) if group_def else None
+            options = [{"type": 2, "name": subcommand, "options": [
+                {"type": 1, "name": subcommand_group, "options": argument_options(ccr_option_field(subcommand_def, 'options', []) if subcommand_def else [])}
+            ]}]
+        elif subcommand:
+            subcommand_def = ccr_find_option(command_options, subcommand, 1)  # SUB_COMMAND
+            options = [{"type": 1, "name": subcommand, "options": argument_options(ccr_option_field(subcommand_def, 'options', []) if subcommand_def else [])}]
+        else:
+            options = argument_options(command_options)
+        
+        return {
+            "version": str(getattr(slash_cmd, 'version', '1')),
+            "id": str(slash_cmd.id),
+            "name": main_command,
+            "type": 1,
+            "options": options
+        }
+
+    def ccr_get_interaction_template(definition, slash_cmd, command_name, kwargs):
+        """Return the serialized interaction data for a command, compiling it once per definition.
+        Templates live on the cached definition, so they are dropped together with it."""
+        template_key = (command_name, tuple(sorted((str(k), str(v)) for k, v in kwargs.items())))
+        templates = definition.setdefault("templates", {}) if definition else {}
+        data_json = templates.get(template_key)
+        if data_json is None:
+            data_json = json.dumps(ccr_compile_interaction_data(slash_cmd, command_name, kwargs), separators=(",", ":"))
+            templates[template_key] = data_json
+        return data_json
+
+    def ccr_interaction_ids(interaction):
+        """Nonce and id of the Interaction returned by a direct slash command call"""
+        interaction_id = getattr(interaction, 'id', None)
+        nonce = getattr(interaction, 'nonce', None)
+        return {"nonce": str(nonce) if nonce else None, "interaction_id": str(interaction_id) if interaction_id else None}
+
+    async def execute_slash_command_custom(channel, bot_id, command_name, debug_mode=False, interaction_nonce=None, **kwargs):
         """
         Custom implementation to execute slash commands with proper argument handling.
         Supports both server bots and user-accessible application bots.
         Handles subcommands (e.g., 'help 2' -> command='help', subcommand='2')
         Uses caching in ccr_channels.json to improve performance by storing command type (server/global)
+        and the manager's SlashDefinitionCache to skip the definition fetch entirely on a hit
+        Each stage runs in a ccr_tracer span, timed for the debug log when debug_mode is on.
         Args:
             channel: Discord channel object
             bot_id: Target bot ID
             command_name: Name of the slash command (can include subcommands)
             debug_mode: Whether to enable debug logging
+            interaction_nonce: Nonce sent with the interaction so the response can be correlated
             **kwargs: Command arguments as key-value pairs
         Returns:
-            dict: {"success": bool, "status_code": int, "response": dict}
+            dict: {"success": bool, "status_code": int, "response": dict, "nonce": str, "interaction_id": str}
+            (nonce/interaction_id only on success)
         """
         ccr_log_to_file(f"🚀 Starting execution of command: {command_name}", debug_mode=debug_mode, important=True)
         
-        start_time = time.time() if debug_mode else None
-        fetch_start_time = None
-        fetch_end_time = None
-        execute_start_time = None
+        total_span = ccr_tracer.span("execute_slash_command", track=channel.id, timed=debug_mode, command=command_name, bot_id=str(bot_id))
+        fetch_span = CCR_NOOP_SPAN
+        execute_span = CCR_NOOP_SPAN
         execution_type = None
         
+        def log_total_time(outcome=""):
+            if debug_mode:
+                ccr_log_to_file(f"⏱️ Total operation time{outcome}: {total_span.elapsed():.3f}s (Fetch: {fetch_span.duration:.3f}s, Execute: {execute_span.duration:.3f}s)", debug_mode=debug_mode, important=True)
+        
         try:
             # Parse command name to handle subcommands
             command_parts = command_name.strip().split()
@@ -382,76 +1121,26 @@ def custom_command_runner_script():
             
             ccr_log_to_file(f"Parsing command '{command_name}' -> main: '{main_command}', sub: '{subcommand}', group: '{subcommand_group}'", debug_mode=debug_mode)
             
-            # Load channels config to check if we already know the command type
-            channels_cfg = await ccr_load_json_data(CCR_CHANNELS_FILE, {"channels": {}})
-            channel_id = str(channel.id)
-            cached_slash_type = None
-            
-            # Find the command in the channel config and get its cached slash_type and execution_type
-            if channel_id in channels_cfg.get("channels", {}):
-                channel_commands = channels_cfg["channels"][channel_id].get("commands", [])
-                for cmd in channel_commands:
-                    cmd_name = cmd.get("name", "")
-                    cmd_main = cmd_name.split()[0] if cmd_name else ""
-                    
-                    if (cmd_main == main_command and 
-                        ccr_safe_int(cmd.get("bot_id", 0)) == ccr_safe_int(bot_id) and 
-                        cmd.get("command_type") == "slash"):
-                        cached_slash_type = cmd.get("slash_type")
-                        execution_type = cmd.get("execution_type", "direct")  # Default to "direct" if not set
-                        break
-            
-            slash_cmd = None
-            command_type = None  # 'server' or 'global'
+            # Look the command up in the manager's in-memory config to get its cached slash_type and execution_type
+            with ccr_tracer.span("config_lookup", track=channel.id):
+                manager = ccr_get_manager()
+                channel_id = str(channel.id)
+                command_config = manager.ccr_find_slash_command(channel_id, main_command, bot_id) if manager else None
+                if command_config:
+                    execution_type = command_config.get("execution_type", "direct")  # Default to "direct" if not set
             
-            # Start timing for fetch operation
-            if debug_mode:
-                fetch_start_time = time.time()
-                ccr_log_to_file(f"⏱️ Starting fetch operation for command '{main_command}'", debug_mode=debug_mode)
-            
-            # If we have cached slash_type, try the cached type first
-            if cached_slash_type:
-                ccr_log_to_file(f"Found cached slash_type for '{main_command}': {cached_slash_type}", debug_mode=debug_mode)
-                
-                if cached_slash_type == 'server':
-                    slash_cmd = await fetchSlashCommand(channel, bot_id, main_command)
-
-                    if slash_cmd:
-                        command_type = 'server'
-                        ccr_log_to_file(f"✅ Found command '{main_command}' in server for bot {bot_id} (from cache)", debug_mode=debug_mode)
-                elif cached_slash_type == 'global':
-                    # Try global commands directly
-                    slash_cmd = await ccr_fetch_global_command(bot_id, main_command, debug_mode)
-                    if slash_cmd:
-                        command_type = 'global'
-                        ccr_log_to_file(f"✅ Found command '{main_command}' as global for bot {bot_id} (from cache)", debug_mode=debug_mode)
+            guild_id = ccr_channel_guild_id(channel)
+            definition_cache = manager.slash_definitions if manager else None
             
-            # If cache miss or cached command not found, do full search
-            if not slash_cmd:
-                ccr_log_to_file(f"Cache miss or cached command not found, performing full search for '{main_command}'", debug_mode=debug_mode)
-                
-                # Step 1: Try to fetch the slash command from server first
-                slash_cmd = await fetchSlashCommand(channel, bot_id, main_command)
-                
-                if slash_cmd:
-                    command_type = 'server'
-                    ccr_log_to_file(f"✅ Found command '{main_command}' in server for bot {bot_id}", debug_mode=debug_mode)
-                
-                # If not found in server, try to get it from global application commands
-                if not slash_cmd:
-                    ccr_log_to_file(f"Command '{main_command}' not found in server for bot {bot_id}, trying global commands...", debug_mode=debug_mode)
-                    slash_cmd = await ccr_fetch_global_command(bot_id, main_command, debug_mode)
-                    if slash_cmd:
-                        command_type = 'global'
-                
-                if slash_cmd and command_type and channel_id in channels_cfg.get("channels", {}):
-                    await ccr_save_slash_type_to_config(channel_id, main_command, bot_id, command_type, debug_mode)
+            ccr_log_to_file(f"⏱️ Starting fetch operation for command '{main_command}'", debug_mode=debug_mode)
+            with ccr_tracer.span("definition_fetch", track=channel.id, timed=debug_mode, command=main_command) as fetch_span:
+                # command_type is 'server' or 'global'
+                slash_cmd, command_type, cached_definition, cache_hit = await ccr_get_slash_definition(channel, bot_id, main_command, command_config, debug_mode)
+                fetch_span.set(cache="hit" if cache_hit else "miss")
+                if cache_hit:
+                    ccr_log_to_file(f"✅ Definition cache hit for '{main_command}' (bot {bot_id}, {command_type})", debug_mode=debug_mode)
             
-            # End timing for fetch operation
-            if debug_mode and fetch_start_time:
-                fetch_end_time = time.time()
-                fetch_duration = fetch_end_time - fetch_start_time
-                ccr_log_to_file(f"⏱️ Fetch operation completed in {fetch_duration:.3f}s for command '{main_command}' (type: {command_type or 'not found'})", debug_mode=debug_mode)
+            ccr_log_to_file(f"⏱️ Fetch operation completed in {fetch_span.duration:.3f}s for command '{main_command}' (type: {command_type or 'not found'})", debug_mode=debug_mode)
             
             if not slash_cmd:
                 error_msg = f"❌ Slash command '{main_command}' not found for bot {bot_id} (tried both server and global commands)"
@@ -461,468 +1150,69 @@ def custom_command_runner_script():
                 # Auto-disable the command
                 disable_result = await ccr_disable_command_automatically(channel.id, main_command, bot_id, debug_mode)
                 
+                total_span.end(status=404)
                 return {"success": False, "status_code": 404, "response": {"error": error_msg}}
             
-            payload = {
-                "type": 2,
-                "application_id": str(bot_id),
-                "channel_id": str(channel.id),
-                "session_id": "placeholder_session",
-                "nonce": str(int(time.time() * 1000)),
-                "data": {
-                    "version": str(getattr(slash_cmd, 'version', '1')),
-                    "id": str(slash_cmd.id),
-                    "name": main_command,
-                    "type": 1,
-                    "options": []
-                }
-            }
-            
-            if hasattr(channel, 'guild') and channel.guild:
-                payload["guild_id"] = str(channel.guild.id)
-            
-            ccr_log_to_file(f"Built payload for command '{main_command}' with bot {bot_id}", debug_mode=debug_mode)
-            guild_info = getattr(channel.guild, 'id', 'DM') if hasattr(channel, 'guild') and channel.guild else 'DM'
-            ccr_log_to_file(f"Channel: {channel.id}, Guild: {guild_info}", debug_mode=debug_mode)
-            
-            # Step 3: Handle subcommands, subcommand groups, and arguments
-            if subcommand:
-                if subcommand_group:
-                    # Handle 3-level command:
-                    subcommand_group_option = {
-                        "type": 2,  # SUB_COMMAND_GROUP
-                        "name": subcommand,  # the subcommand group
-                        "options": []
-                    }
-                    
-                    # Second level: actual subcommand
-                    actual_subcommand_option = {
-                        "type": 1,  # SUB_COMMAND
-                        "name": subcommand_group,  # the actual subcommand
-                        "options": []
-                    }
-                    
-                    # Check command structure regardless of kwargs
-                    command_options = getattr(slash_cmd, 'options', [])
-                    subcommand_group_def = None
-                    actual_subcommand_def = None
-                    
-                    # Find the subcommand group definition
-                    ccr_log_to_file(f"DEBUG: Looking for subcommand_group '{subcommand}' in {len(command_options)} options", important=True)
-                    for cmd_option in command_options:
-                        cmd_name = cmd_option.name if hasattr(cmd_option, 'name') else cmd_option.get('name')
-                        cmd_type = cmd_option.type if hasattr(cmd_option, 'type') else cmd_option.get('type')
-                        ccr_log_to_file(f"DEBUG: Found option '{cmd_name}' with type {cmd_type}", important=True)
-                        if cmd_name == subcommand and cmd_type == 2:  # SUB_COMMAND_GROUP
-                            subcommand_group_def = cmd_option
-                            ccr_log_to_file(f"DEBUG: Found subcommand_group_def for '{subcommand}'", important=True)
-                            break
-                    
-                    # Find the actual subcommand definition within the group
-                    if subcommand_group_def:
-                        group_options = getattr(subcommand_group_def, 'options', []) if hasattr(subcommand_group_def, 'options') else subcommand_group_def.get('options', [])
-                        ccr_log_to_file(f"DEBUG: Looking for subcommand '{subcommand_group}' in {len(group_options)} group options", important=True)
-                        for group_option in group_options:
-                            group_opt_name = group_option.name if hasattr(group_option, 'name') else group_option.get('name')
-                            group_opt_type = group_option.type if hasattr(group_option, 'type') else group_option.get('type')
-                            ccr_log_to_file(f"DEBUG: Found group option '{group_opt_name}' with type {group_opt_type}", important=True)
-                            if group_opt_name == subcommand_group and group_opt_type == 1:  # SUB_COMMAND
-                                actual_subcommand_def = group_option
-                                ccr_log_to_file(f"DEBUG: Found actual_subcommand_def for '{subcommand_group}'", important=True)
-                                break
-                    else:
-                        ccr_log_to_file(f"DEBUG: subcommand_group_def not found for '{subcommand}'", important=True)
-                    
-                    # If there are kwargs, add them to the actual subcommand options
-                    if kwargs:
-                        
-                        # Add arguments to the actual subcommand
-                        for key, value in kwargs.items():
-                            actual_param_name = key
-                            if main_command == '8ball' and key == 'pregunta':
-                                actual_param_name = 'question'
-                            
-                            option_def = None
-                            sub_options = getattr(actual_subcommand_def, 'options', []) if actual_subcommand_def else []
-                            if not sub_options and actual_subcommand_def and hasattr(actual_subcommand_def, '__getitem__'):
-                                sub_options = actual_subcommand_def.get('options', [])
-                            
-                            for sub_option in sub_options:
-                                sub_name = sub_option.name if hasattr(sub_option, 'name') else sub_option.get('name')
-                                if sub_name == actual_param_name:
-                                    option_def = sub_option
-                                    break
-                            
-                            # Handle choices and option types
-                            final_value = str(value)
-                            if option_def:
-                                choices = getattr(option_def, 'choices', []) if hasattr(option_def, 'choices') else option_def.get('choices', [])
-                                if choices:
-                                    for choice in choices:
-                                        choice_name = choice.get('name', '') if isinstance(choice, dict) else getattr(choice, 'name', '')
-                                        choice_value = choice.get('value', '') if isinstance(choice, dict) else getattr(choice, 'value', '')
-                                        if str(value) == choice_name or str(value) == choice_value:
-                                            final_value = choice_value
-                                            break
-                            
-                            # Get the correct option type
-                            option_type = 3  # STRING type by default
-                            if option_def:
-                                if hasattr(option_def, 'type'):
-                                    option_type = option_def.type.value if hasattr(option_def.type, 'value') else option_def.type
-                                else:
-                                    option_type = option_def.get('type', 3)
-                            
-                            # Create the option based on type
-                            if option_type == 6:  # USER type
-                                option = {
-                                    "type": option_type,
-                                    "name": actual_param_name,
-                                    "value": str(final_value)
-                                }
-                            elif option_type == 9:  # MENTIONABLE type
-                                option = {
-                                    "type": option_type,
-                                    "name": actual_param_name,
-                                    "value": str(final_value)
-                                }
-                            elif option_type == 4:  # INTEGER type
-                                try:
-                                    if '.' in str(final_value):
-                                        try:
-                                            float_val = float(str(final_value))
-                                            int_value = int(float_val)
-                                        except (ValueError, TypeError):
-                                            raise ValueError(f"Cannot convert '{final_value}' to integer")
-                                    else:
-                                        int_value = int(final_value)
-                                    option = {
-                                        "type": option_type,
-                                        "name": actual_param_name,
-                                        "value": int_value
-                                    }
-                                except ValueError:
-                                    option = {
-                                        "type": 3,  # Fallback to STRING
-                                        "name": actual_param_name,
-                                        "value": str(final_value)
-                                    }
-                            elif option_type == 5:  # BOOLEAN type
-                                bool_value = str(final_value).lower() in ['true', '1', 'yes', 'on']
-                                option = {
-                                    "type": option_type,
-                                    "name": actual_param_name,
-                                    "value": bool_value
-                                }
-                            else:  # STRING and other types
-                                option = {
-                                    "type": option_type,
-                                    "name": actual_param_name,
-                                    "value": str(final_value)
-                                }
-                            
-                            actual_subcommand_option["options"].append(option)
-                    
-                    # Add the actual subcommand to the subcommand group
-                    subcommand_group_option["options"].append(actual_subcommand_option)
-                    
-                    # Add the subcommand group to the main payload
-                    payload["data"]["options"].append(subcommand_group_option)
-                    ccr_log_to_file(f"Added 3-level command structure: '{main_command}' -> '{subcommand}' -> '{subcommand_group}' with {len(kwargs)} arguments", debug_mode=debug_mode)
-                    
-                else:
-                    # Handle 2-level command: /command subcommand
-                    subcommand_option = {
-                        "type": 1,  # SUB_COMMAND
-                        "name": subcommand,
-                        "options": []
-                    }
-                    
-                    # If there are kwargs, add them to the subcommand options
-                    if kwargs:
-                        command_options = getattr(slash_cmd, 'options', [])
-                        subcommand_def = None
-                        for cmd_option in command_options:
-                            # Handle both dict and Option object
-                            cmd_name = cmd_option.name if hasattr(cmd_option, 'name') else cmd_option.get('name')
-                            cmd_type = cmd_option.type if hasattr(cmd_option, 'type') else cmd_option.get('type')
-                            if cmd_name == subcommand and cmd_type == 1:
-                                subcommand_def = cmd_option
-                                break
-                    
-                    for key, value in kwargs.items():
-                        # Handle parameter name mapping for specific commands
-                        actual_param_name = key
-                        if main_command == '8ball' and key == 'pregunta':
-                            actual_param_name = 'question'
-                        
-                        option_def = None
-                        sub_options = getattr(subcommand_def, 'options', []) if subcommand_def else []
-                        if not sub_options and subcommand_def and hasattr(subcommand_def, '__getitem__'):
-                            sub_options = subcommand_def.get('options', [])
-                        
-                        for sub_option in sub_options:
-                            sub_name = sub_option.name if hasattr(sub_option, 'name') else sub_option.get('name')
-                            if sub_name == actual_param_name:
-                                option_def = sub_option
-                                break
-                        
-                        # Handle choices - if the option has choices, find the correct value
-                        final_value = str(value)
-                        if option_def:
-                            choices = getattr(option_def, 'choices', []) if hasattr(option_def, 'choices') else option_def.get('choices', [])
-                            if choices:
-                                # Look for the choice that matches the provided value (either by name or value)
-                                for choice in choices:
-                                    choice_name = choice.get('name', '') if isinstance(choice, dict) else getattr(choice, 'name', '')
-                                    choice_value = choice.get('value', '') if isinstance(choice, dict) else getattr(choice, 'value', '')
-                                    if str(value) == choice_name or str(value) == choice_value:
-                                        final_value = choice_value
-                                        break
-                        
-                        # Get the correct option type from subcommand definition
-                        option_type = 3  # STRING type by default
-                        if option_def:
-                            if hasattr(option_def, 'type'):
-                                option_type = option_def.type.value if hasattr(option_def.type, 'value') else option_def.type
-                            else:
-                                option_type = option_def.get('type', 3)
-                        
-                        # Handle different argument types properly for subcommands
-                        if option_type == 6:  # USER type
-                            option = {
-                                "type": option_type,
-                                "name": actual_param_name,
-                                "value": str(final_value)
-                            }
-                            ccr_log_to_file(f"Processing USER subcommand argument '{actual_param_name}': {final_value}", debug_mode=debug_mode)
-                        elif option_type == 9:  # MENTIONABLE type
-                            option = {
-                                "type": option_type,
-                                "name": actual_param_name,
-                                "value": str(final_value)
-                            }
-                            ccr_log_to_file(f"Processing MENTIONABLE subcommand argument '{actual_param_name}': {final_value}", debug_mode=debug_mode)
-                        elif option_type == 4:  # INTEGER type
-                            try:
-                                if '.' in str(final_value):
-                                    try:
-                                        float_val = float(str(final_value))
-                                        int_value = int(float_val)
-                                    except (ValueError, TypeError):
-                                        raise ValueError(f"Cannot convert '{final_value}' to integer")
-                                else:
-                                    int_value = int(final_value)
-                                option = {
-                                    "type": option_type,
-                                    "name": actual_param_name,
-                                    "value": int_value
-                                }
-                            except ValueError:
-                                option = {
-                                    "type": 3,  # Fallback to STRING
-                                    "name": actual_param_name,
-                                    "value": str(final_value)
-                                }
-                        elif option_type == 5:  # BOOLEAN type
-                            bool_value = str(final_value).lower() in ['true', '1', 'yes', 'on']
-                            option = {
-                                "type": option_type,
-                                "name": actual_param_name,
-                                "value": bool_value
-                            }
-                        else:  # STRING and other types
-                            option = {
-                                "type": option_type,
-                                "name": actual_param_name,
-                                "value": str(final_value)
-                            }
-                        
-                        subcommand_option["options"].append(option)
-                    
-                    payload["data"]["options"].append(subcommand_option)
-                    ccr_log_to_file(f"Added subcommand '{subcommand}' with {len(kwargs)} arguments", debug_mode=debug_mode)
-                
-            elif kwargs:
-                # No subcommand, add arguments directly to main command
-                command_options = getattr(slash_cmd, 'options', [])
-                
-                for key, value in kwargs.items():
-                    actual_param_name = key
-                    if main_command == '8ball' and key == 'pregunta':
-                        actual_param_name = 'question'
-                    
-                    # Find the option definition for choices handling only
-                    option_def = None
-                    for cmd_option in command_options:
-                        # Handle both dict and Option object
-                        cmd_name = cmd_option.name if hasattr(cmd_option, 'name') else cmd_option.get('name')
-                        if cmd_name == actual_param_name:
-                            option_def = cmd_option
-                            break
-                    
-                    # Handle choices - if the option has choices, find the correct value
-                    clean_value = str(value).strip('"\'')
-                    final_value = clean_value
-                    if option_def:
-                        choices = getattr(option_def, 'choices', []) if hasattr(option_def, 'choices') else option_def.get('choices', [])
-                        if choices:
-                            for choice in choices:
-                                choice_name = choice.get('name', '') if isinstance(choice, dict) else getattr(choice, 'name', '')
-                                choice_value = choice.get('value', '') if isinstance(choice, dict) else getattr(choice, 'value', '')
-                                if clean_value == choice_name or clean_value == choice_value:
-                                    final_value = choice_value
-                                    break
-                    
-                    # Get the correct option type from command definition
-                    option_type = 3  # STRING type by default
-                    if option_def:
-                        if hasattr(option_def, 'type'):
-                            option_type = option_def.type.value if hasattr(option_def.type, 'value') else option_def.type
-                        else:
-                            option_type = option_def.get('type', 3)
-
-                    
-                    # Handle different argument types properly
-                    if option_type == 6:  # USER type
-                        option = {
-                            "type": option_type,
-                            "name": actual_param_name,
-                            "value": str(final_value)
-                        }
-                        ccr_log_to_file(f"Processing USER argument '{actual_param_name}': {final_value}", debug_mode=debug_mode)
-                    elif option_type == 9:  # MENTIONABLE type
-                        option = {
-                            "type": option_type,
-                            "name": actual_param_name,
-                            "value": str(final_value)
-                        }
-                        ccr_log_to_file(f"Processing MENTIONABLE argument '{actual_param_name}': {final_value}", debug_mode=debug_mode)
-                    elif option_type == 4:  # INTEGER type
-                        try:
-                            option = {
-                                "type": option_type,
-                                "name": actual_param_name,
-                                "value": int(final_value)
-                            }
-                        except ValueError:
-                            option = {
-                                "type": 3,  # Fallback to STRING
-                                "name": actual_param_name,
-                                "value": str(final_value)
-                            }
-                    elif option_type == 10:  # NUMBER type
-                        try:
-                            option = {
-                                "type": option_type,
-                                "name": actual_param_name,
-                                "value": float(final_value)
-                            }
-                        except ValueError:
-                            option = {
-                                "type": 3,  # Fallback to STRING
-                                "name": actual_param_name,
-                                "value": str(final_value)
-                            }
-                    elif option_type == 5:  # BOOLEAN type
-                        option = {
-                            "type": option_type,
-                            "name": actual_param_name,
-                            "value": str(final_value).lower() in ('true', '1', 'yes', 'on')
-                        }
-                    else:  # STRING and other types
-                        option = {
-                            "type": option_type,
-                            "name": actual_param_name,
-                            "value": str(final_value)
-                        }
-                    payload["data"]["options"].append(option)
-                    
-            
             # Handle commands without subcommands
             if not subcommand:
                 
                 # Check if command is marked as API-only
                 if execution_type == "api":
                     ccr_log_to_file(f"Skipping direct execution for /{main_command} (marked as API-only)", debug_mode=debug_mode)
-                elif not kwargs:
-                    # Command has no subcommands and no arguments - execute directly
-                    ccr_log_to_file(f"Executing command '{main_command}' directly without subcommands or arguments", debug_mode=debug_mode)
-                    
-                    # Start timing for execute operation
-                    if debug_mode:
-                        execute_start_time = time.time()
-                        ccr_log_to_file(f"⏱️ Starting execute operation for command '{main_command}'", debug_mode=debug_mode)
+                elif cached_definition and cached_definition.get("persisted"):
+                    # A disk-cached definition isn't callable; use the API without marking the command API-only
+                    ccr_log_to_file(f"Skipping direct execution for /{main_command} (definition from disk cache)", debug_mode=debug_mode)
+                else:
+                    # Direct execution, with or without arguments (commands with subcommands always use the API)
+                    with_args = " with args" if kwargs else ""
+                    if kwargs:
+                        ccr_log_to_file(f"Executing command '{main_command}' directly with arguments: {kwargs}", debug_mode=debug_mode)
+                    else:
+                        ccr_log_to_file(f"Executing command '{main_command}' directly without subcommands or arguments", debug_mode=debug_mode)
                     
+                    ccr_log_to_file(f"⏱️ Starting execute operation for command '{main_command}'", debug_mode=debug_mode)
                     try:
-                        result = await slash_cmd(channel)
-                        
-                        # Log timing for successful execution
-                        if debug_mode:
-                            execute_end_time = time.time()
-                            execute_duration = execute_end_time - execute_start_time
-                            ccr_log_to_file(f"⏱️ Execute operation completed in {execute_duration:.3f} seconds", debug_mode=debug_mode)
+                        with ccr_tracer.span("direct_call", track=channel.id, timed=debug_mode, command=main_command) as execute_span:
+                            result = await slash_cmd(channel, **kwargs)
                         
-                        # Log total operation time
-                        if debug_mode and start_time is not None:
-                            total_end_time = time.time()
-                            total_duration = total_end_time - start_time
-                            fetch_duration = fetch_end_time - fetch_start_time if 'fetch_end_time' in locals() and 'fetch_start_time' in locals() and fetch_start_time is not None and fetch_end_time is not None else 0
-                            ccr_log_to_file(f"⏱️ Total operation time: {total_duration:.3f}s (Fetch: {fetch_duration:.3f}s, Execute: {execute_duration:.3f}s)", debug_mode=debug_mode, important=True)
+                        ccr_log_to_file(f"⏱️ Execute operation completed in {execute_span.duration:.3f} seconds", debug_mode=debug_mode)
+                        log_total_time()
                         
                         # Save successful direct execution type
                         if execution_type != "direct":
                             await ccr_save_execution_type_to_config(str(channel.id), main_command, bot_id, "direct", debug_mode)
-                        ccr_log_to_file(f"✅ Successfully executed /{main_command} directly in channel {channel.id}" + "\n", level="SUCCESS", debug_mode=debug_mode, important=True)
-                        return {"success": True, "status_code": 200, "response": {}}
+                        ccr_log_to_file(f"✅ Successfully executed /{main_command}{with_args} directly in channel {channel.id}" + "\n", level="SUCCESS", debug_mode=debug_mode, important=True)
+                        total_span.end(path="direct", status=200)
+                        return {"success": True, "status_code": 200, "response": {}, **ccr_interaction_ids(result)}
                     except Exception as direct_exec_error:
                         error_msg = str(direct_exec_error)
-                        ccr_log_to_file(f"❌ Direct execution failed for /{main_command}: {error_msg}", level="ERROR", debug_mode=debug_mode)
+                        ccr_log_to_file(f"❌ Direct execution{with_args} failed for /{main_command}: {error_msg}", level="ERROR", debug_mode=debug_mode)
+                        if definition_cache and ccr_is_stale_definition_error(error_msg):
+                            definition_cache.invalidate(bot_id, guild_id, main_command)
                         # Save as API-only if it's a MockSlashCmd error
                         if "'MockSlashCmd' object is not callable" in error_msg:
                             await ccr_save_execution_type_to_config(str(channel.id), main_command, bot_id, "api", debug_mode)
                             ccr_log_to_file(f"📝 Marked /{main_command} as API-only due to MockSlashCmd error", debug_mode=debug_mode)
                         # Fall back to API method below
-                elif execution_type != "api":
-                    # Command has arguments but no subcommands - execute with args (only if not marked as API-only)
-                    ccr_log_to_file(f"Executing command '{main_command}' directly with arguments: {kwargs}", debug_mode=debug_mode)
-                    
-                    # Start timing for execute operation
-                    if debug_mode:
-                        execute_start_time = time.time()
-                        ccr_log_to_file(f"⏱️ Starting execute operation for command '{main_command}'", debug_mode=debug_mode)
-                    
-                    try:
-                        result = await slash_cmd(channel, **kwargs)
-                        
-                        # Log timing for successful execution
-                        if debug_mode:
-                            execute_end_time = time.time()
-                            execute_duration = execute_end_time - execute_start_time
-                            ccr_log_to_file(f"⏱️ Execute operation completed in {execute_duration:.3f} seconds", debug_mode=debug_mode)
-                        
-                        # Log total operation time
-                        if debug_mode and start_time is not None:
-                            total_end_time = time.time()
-                            total_duration = total_end_time - start_time
-                            fetch_duration = fetch_end_time - fetch_start_time if 'fetch_end_time' in locals() and 'fetch_start_time' in locals() and fetch_start_time is not None and fetch_end_time is not None else 0
-                            ccr_log_to_file(f"⏱️ Total operation time: {total_duration:.3f}s (Fetch: {fetch_duration:.3f}s, Execute: {execute_duration:.3f}s)", debug_mode=debug_mode, important=True)
-                        
-                        # Save successful direct execution type
-                        if execution_type != "direct":
-                            await ccr_save_execution_type_to_config(str(channel.id), main_command, bot_id, "direct", debug_mode)
-                        ccr_log_to_file(f"✅ Successfully executed /{main_command} with args directly in channel {channel.id}" + "\n", level="SUCCESS", debug_mode=debug_mode, important=True)
-                        return {"success": True, "status_code": 200, "response": {}}
-                    except Exception as direct_exec_error:
-                        error_msg = str(direct_exec_error)
-                        ccr_log_to_file(f"❌ Direct execution with args failed for /{main_command}: {error_msg}", level="ERROR", debug_mode=debug_mode)
-                        # Save as API-only if it's a MockSlashCmd error
-                        if "'MockSlashCmd' object is not callable" in error_msg:
-                            await ccr_save_execution_type_to_config(str(channel.id), main_command, bot_id, "api", debug_mode)
-                            ccr_log_to_file(f"📝 Marked /{main_command} as API-only", debug_mode=debug_mode)
                     
             # Step 4: Send the interaction via Discord API (fallback method)
-            url = "https://discord.com/api/v10/interactions"
+            url = ccr_api_url("/v10/interactions")
+            
+            with ccr_tracer.span("payload_build", track=channel.id):
+                # Only the per-execution ids and nonce are filled in; the data part is a compiled template
+                data_json = ccr_get_interaction_template(cached_definition, slash_cmd, command_name, kwargs)
+                envelope = {
+                    "type": 2,
+                    "application_id": str(bot_id),
+                    "channel_id": str(channel.id),
+                    "session_id": "placeholder_session",
+                    "nonce": interaction_nonce or ccr_new_interaction_nonce()
+                }
+                if guild_id:
+                    envelope["guild_id"] = str(guild_id)
+                payload_json = json.dumps(envelope, separators=(",", ":"))[:-1] + ',"data":' + data_json + "}"
+            ccr_log_to_file(f"Built payload for command '{main_command}' with bot {bot_id}", debug_mode=debug_mode)
+            ccr_log_to_file(f"Channel: {channel.id}, Guild: {guild_id or 'DM'}", debug_mode=debug_mode)
             
             # Get the token
             token = bot.http.token
@@ -936,80 +1226,160 @@ def custom_command_runner_script():
             }
             
             ccr_log_to_file(f"Executing /{command_name} in channel {channel.id} with args: {kwargs}", debug_mode=debug_mode, important=True)
+            ccr_log_to_file(f"⏱️ Starting execute operation for command '{command_name}'", debug_mode=debug_mode)
             
-            # Start timing for execute operation
-            if debug_mode:
-                execute_start_time = time.time()
-                ccr_log_to_file(f"⏱️ Starting execute operation for command '{command_name}'", debug_mode=debug_mode)
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers) as response:
+            session = manager.ccr_get_http_session()
+            with ccr_tracer.span("http_send", track=channel.id, timed=debug_mode, command=command_name) as execute_span:
+                async with session.post(url, data=payload_json, headers=headers) as response:
                     response_text = await response.text()
-                    
-                    if response.status == 204:
-                        # Log timing for successful execution
-                        if debug_mode:
-                            execute_end_time = time.time()
-                            execute_duration = execute_end_time - execute_start_time
-                            ccr_log_to_file(f"⏱️ Execute operation completed in {execute_duration:.3f} seconds", debug_mode=debug_mode)
-                        
-                        # Log total operation time
-                        if debug_mode and start_time is not None:
-                            total_end_time = time.time()
-                            total_duration = total_end_time - start_time
-                            fetch_duration = fetch_end_time - fetch_start_time if 'fetch_end_time' in locals() and 'fetch_start_time' in locals() and fetch_start_time is not None and fetch_end_time is not None else 0
-                            ccr_log_to_file(f"⏱️ Total operation time: {total_duration:.3f}s (Fetch: {fetch_duration:.3f}s, Execute: {execute_duration:.3f}s)", debug_mode=debug_mode, important=True)
-                        
-                        # Save successful API execution type (only if different)
-                        if execution_type != "api":
-                            await ccr_save_execution_type_to_config(str(channel.id), command_name, bot_id, "api", debug_mode)
-                        ccr_log_to_file(f"✅ Successfully executed /{command_name} in channel {channel.id}" + "\n", level="SUCCESS", debug_mode=debug_mode, important=True)
-                        return {"success": True, "status_code": response.status, "response": {}}
-                    else:
-                        # Log timing for failed execution
-                        if debug_mode:
-                            execute_end_time = time.time()
-                            execute_duration = execute_end_time - execute_start_time
-                            ccr_log_to_file(f"⏱️ Execute operation failed after {execute_duration:.3f} seconds", debug_mode=debug_mode, important=True)
-
-                        ccr_log_to_file(f"❌ Failed to execute /{command_name}. Status: {response.status}", level="ERROR", debug_mode=debug_mode, important=True)
-                        ccr_log_to_file(f"Response: {response_text}", debug_mode=debug_mode)
-                        
-                        # Log total operation time for failed execution
-                        if debug_mode and start_time is not None:
-                            total_end_time = time.time()
-                            total_duration = total_end_time - start_time
-                            fetch_duration = fetch_end_time - fetch_start_time if 'fetch_end_time' in locals() and 'fetch_start_time' in locals() and fetch_start_time is not None and fetch_end_time is not None else 0
-                            ccr_log_to_file(f"⏱️ Total operation time (failed): {total_duration:.3f}s (Fetch: {fetch_duration:.3f}s, Execute: {execute_duration:.3f}s)", debug_mode=debug_mode, important=True)
-                            ccr_log_to_file(" " * 60 + "\n", debug_mode=debug_mode)
+                    execute_span.set(status=response.status)
+            
+            if response.status == 204:
+                ccr_log_to_file(f"⏱️ Execute operation completed in {execute_span.duration:.3f} seconds", debug_mode=debug_mode)
+                log_total_time()
+                
+                # Save successful API execution type (only if different)
+                if execution_type != "api":
+                    await ccr_save_execution_type_to_config(str(channel.id), command_name, bot_id, "api", debug_mode)
+                ccr_log_to_file(f"✅ Successfully executed /{command_name} in channel {channel.id}" + "\n", level="SUCCESS", debug_mode=debug_mode, important=True)
+                total_span.end(path="api", status=response.status)
+                return {"success": True, "status_code": response.status, "response": {}, "nonce": envelope["nonce"], "interaction_id": None}
+            else:
+                ccr_log_to_file(f"⏱️ Execute operation failed after {execute_span.duration:.3f} seconds", debug_mode=debug_mode, important=True)
+                ccr_log_to_file(f"❌ Failed to execute /{command_name}. Status: {response.status}", level="ERROR", debug_mode=debug_mode, important=True)
+                ccr_log_to_file(f"Response: {response_text}", debug_mode=debug_mode)
+                
+                # Drop a definition the API no longer accepts so the next run refetches it
+                if definition_cache and ccr_is_stale_definition_error(response_text):
+                    definition_cache.invalidate(bot_id, guild_id, main_command)
+                    ccr_log_to_file(f"♻️ Invalidated cached definition for '{main_command}' (bot {bot_id})", debug_mode=debug_mode, important=True)
+                
+                # Log total operation time for failed execution
+                log_total_time(" (failed)")
+                ccr_log_to_file(" " * 60 + "\n", debug_mode=debug_mode)
 
-                        try:
-                            response_json = await response.json()
-                        except:
-                            response_json = {"error": response_text}
-                        return {"success": False, "status_code": response.status, "response": response_json}
-                        
+                try:
+                    response_json = json.loads(response_text)
+                except:
+                    response_json = {"error": response_text}
+                total_span.end(path="api", status=response.status)
+                return {"success": False, "status_code": response.status, "response": response_json}
+                    
         except Exception as e:
             # Log timing for exception
             if debug_mode:
-                if 'execute_start_time' in locals() and execute_start_time is not None:
-                    execute_end_time = time.time()
-                    execute_duration = execute_end_time - execute_start_time
-                    ccr_log_to_file(f"⏱️ Execute operation failed with exception after {execute_duration:.3f} seconds", debug_mode=debug_mode)
-                
-                # Log total operation time for exception
-                if start_time is not None:
-                    total_end_time = time.time()
-                    total_duration = total_end_time - start_time
-                    fetch_duration = fetch_end_time - fetch_start_time if 'fetch_end_time' in locals() and 'fetch_start_time' in locals() and fetch_start_time is not None and fetch_end_time is not None else 0
-                    execute_duration = execute_duration if 'execute_duration' in locals() else 0
-                    ccr_log_to_file(f"⏱️ Total operation time (exception): {total_duration:.3f}s (Fetch: {fetch_duration:.3f}s, Execute: {execute_duration:.3f}s)", debug_mode=debug_mode)
+                ccr_log_to_file(f"⏱️ Execute operation failed with exception after {execute_span.duration:.3f} seconds", debug_mode=debug_mode)
+                log_total_time(" (exception)")
                 ccr_log_to_file(" " * 60 + "\n", debug_mode=debug_mode)
             
             ccr_log_to_file(f"Error in custom slash execution: {str(e)}", level="ERROR", debug_mode=debug_mode, important=True)
             traceback.print_exc()
+            total_span.end(error=str(e))
             return {"success": False, "status_code": 0, "response": {"error": f"Exception: {str(e)}"}}
 
+    # --- Latency Statistics ---
+    # Fixed log-spaced bucket upper bounds (10ms .. ~5min, +25% per bucket), shared by every histogram
+    CCR_HISTOGRAM_BOUNDS = [0.01 * 1.25 ** i for i in range(47)]
+
+    class LatencyHistogram:
+        """Fixed-bucket histogram; percentiles are reported as bucket upper bounds (at most 25% high)"""
+
+        def __init__(self):
+            self.counts = [0] * (len(CCR_HISTOGRAM_BOUNDS) + 1)
+            self.count = 0
+            self.max = 0.0
+
+        def record(self, seconds):
+            seconds = max(0.0, seconds)
+            self.counts[bisect.bisect_left(CCR_HISTOGRAM_BOUNDS, seconds)] += 1
+            self.count += 1
+            self.max = max(self.max, seconds)
+
+        def percentile(self, pct):
+            if not self.count:
+                return None
+            rank = max(1, int(self.count * pct / 100 + 0.999999))
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= rank:
+                    bound = CCR_HISTOGRAM_BOUNDS[index] if index < len(CCR_HISTOGRAM_BOUNDS) else self.max
+                    return min(bound, self.max)
+            return self.max
+
+    class CommandStats:
+        """Counters and histograms for one command or one bot"""
+
+        def __init__(self):
+            self.latency = LatencyHistogram()
+            self.lateness = LatencyHistogram()
+            self.responses = 0
+            self.timeouts = 0
+            self.errors = 0
+            self.auto_disabled = 0
+
+        @property
+        def attempts(self):
+            return self.responses + self.timeouts + self.errors
+
+        def timeout_rate(self):
+            return self.timeouts / self.attempts if self.attempts else 0.0
+
+    def ccr_format_seconds(seconds):
+        if seconds is None:
+            return "-"
+        return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.1f}s"
+
+    class CcrConcurrencyLimit:
+        """Semaphore whose limit can be changed while slots are held. Raising it wakes waiters at once;
+        lowering it lets held slots finish and admits new jobs only once fewer than `limit` are active."""
+        def __init__(self, limit):
+            self.limit = limit
+            self.active = 0
+            self.waiters = deque()
+
+        def locked(self):
+            return self.active >= self.limit
+
+        def resize(self, limit):
+            self.limit = limit
+            self.ccr_wake()
+
+        def ccr_wake(self):
+            while self.waiters and self.active < self.limit:
+                waiter = self.waiters.popleft()
+                if not waiter.done():
+                    self.active += 1
+                    waiter.set_result(True)
+
+        async def acquire(self):
+            if self.active < self.limit and not self.waiters:
+                self.active += 1
+                return True
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Granted a slot just before the cancel arrived; hand it on
+                    self.release()
+                raise
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+            return True
+
+        def release(self):
+            self.active -= 1
+            self.ccr_wake()
+
+        async def __aenter__(self):
+            await self.acquire()
+
+        async def __aexit__(self, exc_type, exc, tb):
+            self.release()
+
     # --- Main Manager Class ---
     class CommandRunnerManager:
         def __init__(self):
@@ -1024,14 +1394,73 @@ def custom_command_runner_script():
             self.channels_cfg = {"channels": {}}
             self.state = {}
             self.ui_elements = None
+            # Outstanding slash commands keyed by interaction nonce, so one channel can have several in flight.
+            # pending_interaction_ids maps the interaction id (once known) back to its nonce,
+            # pending_slash_waiters lists the nonces waiting per (channel_id, bot_id), oldest first
             self.pending_slash_responses = {}
             self.slash_command_results = {}
+            self.pending_interaction_ids = {}
+            self.pending_slash_waiters = {}
+            # Prefix reply futures per (channel_id, author_id); author_id None accepts any bot
+            self.response_waiters = {}
+            # Int ids of channels with any pending response; replaced (never mutated) so on_message can test it without the lock
+            self.watched_channel_ids = frozenset()
             self.pending_responses_lock = asyncio.Lock()
             self.state_lock = asyncio.Lock()
+            # last_used updates are appended to ccr_state.journal and folded into ccr_state.json on compaction
+            self.journal_lock = asyncio.Lock()
+            self.journal_entries = 0
+            # Min-heap of [start_time, seq, cmd_key, channel_id, command_profile, due_time, human_delay, typing_duration];
+            # start_time already includes the humanization delay planned when the job was enqueued.
+            # schedule_entries maps cmd_key to its live entry, older heap entries are skipped lazily
+            self.schedule_heap = []
+            self.schedule_entries = {}
+            self.schedule_seq = 0
+            self.schedule_dirty = True
+            # (channel_id, main_command, bot_id) -> slash command config, rebuilt whenever channels_cfg changes
+            self.slash_command_index = {}
+            self.bot_name_index = {}
+            self.slash_definitions = SlashDefinitionCache()
+            self.slash_definitions.on_change = self.ccr_schedule_slash_cache_save
+            self.slash_cache_save_task = None
+            # Shared by the warm-up and revalidations so a restart with a full disk cache doesn't burst lookups
+            self.slash_lookup_semaphore = asyncio.Semaphore(CCR_WARMUP_CONCURRENCY)
+            # In-memory CommandStats per cmd_key and per bot id, reported by `ccr stats`
+            self.command_stats = {}
+            self.bot_stats = {}
+            # channel_id -> deque of (lateness, human_delay) for the last CCR_LATENESS_WINDOW executions
+            self.channel_lateness = {}
+            self.http_session = None
+            # Webhook log events (embed dicts) waiting for the background sender
+            self.log_queue = asyncio.Queue()
+            self.log_sender_task = None
+            self.log_suppressed = {}
+            self.webhook_blocked_until = 0
+            self.channels_save_task = None
+            self.channels_save_dirty = False
+            # Per-channel execution lanes: channel_id -> {"queue": asyncio.Queue, "task": asyncio.Task}
+            self.lanes = {}
+            self.inflight_jobs = set()
+            self.execution_semaphore = CcrConcurrencyLimit(3)
+            # Time source for scheduling; `ccr dryrun` runs a copy of the manager on a virtual clock
+            self.clock = CcrClock()
 
         async def ccr_load_initial_data(self):
             self.channels_cfg = await ccr_load_json_data(CCR_CHANNELS_FILE, {"channels": {}})
+            self.ccr_rebuild_command_index()
             self.state = await ccr_load_json_data(CCR_STATE_FILE, ccr_get_default_state())
+            self.slash_definitions.load(await ccr_load_json_data(CCR_SLASH_CACHE_FILE, {"version": 1, "definitions": []}))
+            # Replay last_used updates written after the last snapshot
+            journal_records = await ccr_read_journal(CCR_STATE_JOURNAL_FILE)
+            if journal_records and isinstance(self.state, dict):
+                last_used = self.state.setdefault("last_used", {})
+                for record in journal_records:
+                    if isinstance(record, dict) and "key" in record and "t" in record:
+                        last_used[record["key"]] = record["t"]
+                self.journal_entries = len(journal_records)
+                await self.ccr_save_state()
+            ccr_log_sink.debug_mode = bool(self.state.get("debug_mode", False)) if isinstance(self.state, dict) else False
+            self.schedule_dirty = True
 
         def ccr_set_ui_elements(self, ui_elements):
             self.ui_elements = ui_elements
@@ -1182,14 +1611,96 @@ def custom_command_runner_script():
         def ccr_set_channel_editor_updater(self, updater_func): self.channel_editor_updater = updater_func
 
         async def ccr_save_channels(self):
-            await ccr_save_json_data(CCR_CHANNELS_FILE, self.channels_cfg)
+            self.ccr_rebuild_command_index()
+            await ccr_save_json_data(CCR_CHANNELS_FILE, copy.deepcopy(self.channels_cfg))
             if self.channel_editor_updater: self.channel_editor_updater()
+
+        def ccr_schedule_channels_save(self, delay=2.0):
+            """Persist channels_cfg in the background, coalescing updates made within `delay` seconds.
+            A change made while a save is being written marks the config dirty and the task saves again."""
+            self.channels_save_dirty = True
+            if self.channels_save_task and not self.channels_save_task.done():
+                return
+            async def _delayed_save():
+                while self.channels_save_dirty:
+                    await asyncio.sleep(delay)
+                    self.channels_save_dirty = False
+                    # Copied on the loop thread so the executor never serializes a dict that is being edited
+                    save = asyncio.ensure_future(ccr_save_json_data(CCR_CHANNELS_FILE, copy.deepcopy(self.channels_cfg)))
+                    try:
+                        await asyncio.shield(save)
+                    except asyncio.CancelledError:
+                        # Let the write finish so it can't land after the flush in ccr_shutdown
+                        await save
+                        raise
+            self.channels_save_task = bot.loop.create_task(_delayed_save())
+
+        def ccr_schedule_slash_cache_save(self, delay=5.0):
+            """Persist the slash definition cache in the background, coalescing changes made within `delay` seconds"""
+            if self.slash_cache_save_task and not self.slash_cache_save_task.done():
+                return
+            async def _delayed_save():
+                await asyncio.sleep(delay)
+                await ccr_save_json_data(CCR_SLASH_CACHE_FILE, self.slash_definitions.export())
+            self.slash_cache_save_task = bot.loop.create_task(_delayed_save())
+
+        def ccr_revalidate_slash_definition(self, channel, bot_id, main_command, command_config=None, debug_mode=False):
+            """Refresh a definition loaded from disk in the background; the disk copy keeps serving until then"""
+            guild_id = ccr_channel_guild_id(channel)
+            key = SlashDefinitionCache.make_key(bot_id, guild_id, main_command)
+            if key in self.slash_definitions.revalidating:
+                return
+            self.slash_definitions.revalidating.add(key)
+            
+            async def _revalidate():
+                try:
+                    cached_slash_type = command_config.get("slash_type") if command_config else None
+                    async with self.slash_lookup_semaphore:
+                        slash_cmd, command_type, confirmed_missing = await ccr_resolve_slash_command(channel, bot_id, main_command, cached_slash_type, debug_mode)
+                    if slash_cmd:
+                        self.slash_definitions.put(bot_id, guild_id, main_command, slash_cmd, command_type)
+                    elif confirmed_missing:
+                        # Gone from the bot: the next run looks it up again and auto-disables it
+                        self.slash_definitions.invalidate(bot_id, guild_id, main_command)
+                except Exception as e:
+                    ccr_log_to_file(f"Revalidation of '{main_command}' (bot {bot_id}) failed: {e}", level="ERROR", debug_mode=debug_mode)
+                finally:
+                    self.slash_definitions.revalidating.discard(key)
+            bot.loop.create_task(_revalidate())
+
+        def ccr_forget_missing_command(self, command_profile):
+            """Forget a "not found" lookup result for a slash command so its next run searches again"""
+            if command_profile.get("command_type") != "slash" or not command_profile.get("name"):
+                return 0
+            return self.slash_definitions.forget_missing(ccr_safe_int(command_profile.get("bot_id")), command_profile["name"].split()[0])
+
+        def ccr_rebuild_command_index(self):
+            slash_command_index = {}
+            bot_name_index = {}
+            for channel_id, cfg in self.channels_cfg.get("channels", {}).items():
+                for cmd in cfg.get("commands", []):
+                    cmd_name = cmd.get("name", "")
+                    bot_id = ccr_safe_int(cmd.get("bot_id", 0))
+                    if cmd.get("bot_name"):
+                        bot_name_index.setdefault(bot_id, cmd["bot_name"])
+                    if cmd.get("command_type") == "slash" and cmd_name:
+                        # First match wins, like the linear scans this replaces
+                        slash_command_index.setdefault((channel_id, cmd_name.split()[0], bot_id), cmd)
+            self.slash_command_index = slash_command_index
+            self.bot_name_index = bot_name_index
+
+        def ccr_find_slash_command(self, channel_id, main_command, bot_id):
+            return self.slash_command_index.get((ccr_channel_id_string(channel_id), main_command, ccr_safe_int(bot_id)))
+
+        def ccr_get_bot_name(self, bot_id):
+            return self.bot_name_index.get(ccr_safe_int(bot_id), "")
         
         async def ccr_remove_channel(self, channel_id):
             if channel_id in self.channels_cfg["channels"]:
                 del self.channels_cfg["channels"][channel_id]
                 self.command_locks = {k: v for k, v in self.command_locks.items() if not k.startswith(f"{channel_id}-")}
                 await self.ccr_save_channels()
+                self.ccr_trigger_reschedule()
         
         async def ccr_remove_custom_command(self, channel_id, command_name):
             if channel_id in self.channels_cfg["channels"]:
@@ -1220,11 +1731,29 @@ def custom_command_runner_script():
                 return data
 
         async def ccr_save_state(self): 
-            async with self.state_lock:
-                clean_state = self._clean_data_for_json(self.state)
-            await ccr_save_json_data(CCR_STATE_FILE, clean_state)
+            """Write a full snapshot of the state; this also compacts the last_used journal"""
+            async with self.journal_lock:
+                async with self.state_lock:
+                    clean_state = self._clean_data_for_json(self.state)
+                # The journal holds the only durable copy of recent updates until the snapshot is on disk
+                if not await ccr_save_json_data(CCR_STATE_FILE, clean_state):
+                    return
+                if self.journal_entries:
+                    await ccr_truncate_journal(CCR_STATE_JOURNAL_FILE)
+                    self.journal_entries = 0
+
+        async def ccr_record_last_used(self, cmd_key, timestamp):
+            """Persist a last_used update with an O(1) journal append instead of a full state rewrite"""
+            self.state.setdefault("last_used", {})[cmd_key] = timestamp
+            async with self.journal_lock:
+                await ccr_append_journal(CCR_STATE_JOURNAL_FILE, {"key": cmd_key, "t": timestamp})
+                self.journal_entries += 1
+            if self.journal_entries >= CCR_JOURNAL_COMPACT_EVERY:
+                await self.ccr_save_state()
 
-        async def ccr_log(self, title, description, color=0x2f3136, message_obj=None, execution_time=None):
+        async def ccr_log(self, title, description, color=0x2f3136, message_obj=None, execution_time=None, priority=CCR_LOG_NORMAL, debug_mode=False):
+            """Queue a log event for the webhook sender; never waits on the webhook itself.
+            debug_mode events are only logged while debug mode is on."""
             # Safety check: ensure state is properly initialized
             if not self.state or not isinstance(self.state, dict):
                 self.state = ccr_get_default_state()
@@ -1235,6 +1764,9 @@ def custom_command_runner_script():
                     if key not in self.state:
                         self.state[key] = default_value
             if not self.state.get("webhook_url") and not self.state.get("console_logs_enabled"): return
+            if debug_mode:
+                if not self.state.get("debug_mode", False): return
+                priority = CCR_LOG_LOW
             
             # Add execution time to description if debug_mode is enabled and execution_time is provided
             if execution_time is not None and self.state.get("debug_mode", False):
@@ -1242,29 +1774,243 @@ def custom_command_runner_script():
             
             if message_obj and hasattr(message_obj, 'jump_url'): description += f"\n\n[Jump to response]({message_obj.jump_url})"
             if self.state.get("webhook_url"):
+                queued = self.log_queue.qsize()
+                if (priority <= CCR_LOG_LOW and queued >= CCR_LOG_BACKPRESSURE) or (priority <= CCR_LOG_NORMAL and queued >= CCR_LOG_QUEUE_LIMIT):
+                    # Under backpressure only a count survives; the sender reports it as one summary embed
+                    self.log_suppressed[title] = self.log_suppressed.get(title, 0) + 1
+                else:
+                    embed = Embed(title=title, description=description, color=color)
+                    embed.set_footer(text=f"CommandRunner v1.2 • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                    self.log_queue.put_nowait(embed.to_dict())
+                self.ccr_ensure_log_sender()
+            if self.state.get("console_logs_enabled", False): print(f"[CommandRunner] {title}: {description.splitlines()[0]}")
+
+        def ccr_ensure_log_sender(self):
+            if self.log_sender_task is None or self.log_sender_task.done():
+                self.log_sender_task = bot.loop.create_task(self.ccr_log_sender())
+
+        def ccr_take_log_summary(self):
+            """Embed summarising the events suppressed under backpressure since the last batch"""
+            if not self.log_suppressed:
+                return None
+            suppressed, self.log_suppressed = self.log_suppressed, {}
+            lines = [f"`{count}×` {title}" for title, count in sorted(suppressed.items(), key=lambda item: -item[1])]
+            embed = Embed(title="Log Events Aggregated", description="Suppressed while the webhook queue was backed up:\n" + "\n".join(lines), color=0x95A5A6)
+            embed.set_footer(text=f"CommandRunner v1.2 • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            return embed.to_dict()
+
+        async def ccr_log_sender(self):
+            """Drain the log queue, packing up to CCR_LOG_BATCH_SIZE embeds into each webhook call"""
+            while True:
+                try:
+                    embeds = [await asyncio.wait_for(self.log_queue.get(), CCR_LOG_SUMMARY_IDLE)]
+                except asyncio.TimeoutError:
+                    # No later event to ride along with; send the pending summary by itself
+                    await self.ccr_flush_log_summary()
+                    continue
+                while len(embeds) < CCR_LOG_BATCH_SIZE and not self.log_queue.empty():
+                    embeds.append(self.log_queue.get_nowait())
+                taken = len(embeds)
+                if taken < CCR_LOG_BATCH_SIZE:
+                    summary = self.ccr_take_log_summary()
+                    if summary:
+                        embeds.append(summary)
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        webhook = Webhook.from_url(self.state["webhook_url"], session=session)
-                        embed = Embed(title=title, description=description, color=color)
-                        embed.set_footer(text=f"CommandRunner v1.2 • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        await webhook.send(embed=embed, username="CommandRunner Logs")
+                    await self.ccr_post_webhook_embeds(embeds)
+                except asyncio.CancelledError:
+                    raise
                 except Exception as e: print(f"[CommandRunner] Webhook Error: {e}")
-            if self.state.get("console_logs_enabled", False): print(f"[CommandRunner] {title}: {description.splitlines()[0]}")
+                finally:
+                    # Marked done only once sent, so ccr_stop_log_sender's join() also waits for the batch in flight
+                    for _ in range(taken):
+                        self.log_queue.task_done()
+
+        async def ccr_flush_log_summary(self):
+            """Send the pending suppressed-events summary as its own webhook call"""
+            summary = self.ccr_take_log_summary()
+            if not summary:
+                return
+            try:
+                await self.ccr_post_webhook_embeds([summary])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e: print(f"[CommandRunner] Webhook Error: {e}")
+
+        async def ccr_post_webhook_embeds(self, embeds):
+            """POST one batch, waiting out the webhook's rate limit bucket and retrying 429s"""
+            for attempt in range(3):
+                wait_time = self.webhook_blocked_until - time.time()
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+                webhook_url = self.state.get("webhook_url")
+                if not webhook_url:
+                    return
+                session = self.ccr_get_http_session()
+                async with session.post(ccr_rebase_api_url(webhook_url), json={"username": "CommandRunner Logs", "embeds": embeds}) as response:
+                    # Stop before the bucket runs dry instead of collecting a 429
+                    if response.headers.get("X-RateLimit-Remaining") == "0":
+                        reset_after = ccr_safe_float(response.headers.get("X-RateLimit-Reset-After"), 0)
+                        self.webhook_blocked_until = max(self.webhook_blocked_until, time.time() + reset_after)
+                    if response.status == 429:
+                        retry_after = ccr_safe_float(response.headers.get("Retry-After"), 0)
+                        if not retry_after:
+                            try:
+                                retry_after = ccr_safe_float((await response.json()).get("retry_after"), 1)
+                            except Exception:
+                                retry_after = 1
+                        self.webhook_blocked_until = time.time() + retry_after
+                        continue
+                    if response.status >= 400:
+                        print(f"[CommandRunner] Webhook Error: HTTP {response.status} {await response.text()}")
+                    return
+            print(f"[CommandRunner] Webhook Error: dropped {len(embeds)} log embeds after repeated rate limits")
+
+        async def ccr_stop_log_sender(self, flush_timeout=5.0):
+            """Give queued and in-flight events up to flush_timeout seconds to go out, then stop the sender.
+            A pending suppressed-events summary is sent last."""
+            if self.log_sender_task and not self.log_sender_task.done():
+                try:
+                    await asyncio.wait_for(self.log_queue.join(), flush_timeout)
+                except asyncio.TimeoutError:
+                    print(f"[CommandRunner] Webhook Error: stopped with {self.log_queue.qsize()} log embeds still queued")
+                self.log_sender_task.cancel()
+            if self.log_suppressed and self.state.get("webhook_url"):
+                try:
+                    await asyncio.wait_for(self.ccr_flush_log_summary(), flush_timeout)
+                except asyncio.TimeoutError:
+                    pass
+            self.log_sender_task = None
+
+        def ccr_record_stat(self, cmd_key, bot_id=None, latency=None, lateness=None, outcome=None):
+            """Record one observation for a command and, when known, its bot.
+            outcome is one of "response", "timeout", "error" or "auto_disabled"."""
+            targets = [self.command_stats.setdefault(cmd_key, CommandStats())]
+            if bot_id:
+                targets.append(self.bot_stats.setdefault(str(bot_id), CommandStats()))
+            for stats in targets:
+                if latency is not None:
+                    stats.latency.record(latency)
+                if lateness is not None:
+                    stats.lateness.record(lateness)
+                if outcome == "response":
+                    stats.responses += 1
+                elif outcome == "timeout":
+                    stats.timeouts += 1
+                elif outcome == "error":
+                    stats.errors += 1
+                elif outcome == "auto_disabled":
+                    stats.auto_disabled += 1
+
+        def ccr_record_lateness(self, entry, started_at, typing_duration=0.0):
+            """Lateness is the actual start minus the planned start (due time + human delay + typing),
+            so humanization itself never counts as lag; the human delay is kept alongside for reference.
+            started_at is when the command got its concurrency slot, so waiting for the cap counts."""
+            cmd_key, channel_id, profile, due_time, human_delay = entry[2], entry[3], entry[4], entry[5], entry[6]
+            lateness = max(0.0, started_at - (due_time + human_delay + typing_duration))
+            samples = self.channel_lateness.get(channel_id)
+            if samples is None:
+                samples = self.channel_lateness[channel_id] = deque(maxlen=CCR_LATENESS_WINDOW)
+            samples.append((lateness, human_delay))
+            self.ccr_record_stat(cmd_key, profile.get("bot_id"), lateness=lateness)
+            return lateness
+
+        def ccr_lateness_summary(self, channel_id):
+            """Rolling lateness aggregates over the channel's recent executions, or None without samples"""
+            samples = self.channel_lateness.get(channel_id)
+            if not samples:
+                return None
+            lateness = sorted(sample[0] for sample in samples)
+            return {
+                "count": len(lateness),
+                "avg": sum(lateness) / len(lateness),
+                "p95": lateness[min(len(lateness) - 1, int(len(lateness) * 0.95))],
+                "max": lateness[-1],
+                "human_delay_avg": sum(sample[1] for sample in samples) / len(samples)
+            }
+
+        def ccr_set_max_concurrency(self, max_concurrency):
+            """Cap how many lanes may execute commands at the same time"""
+            max_concurrency = max(1, ccr_safe_int(max_concurrency, 3))
+            self.state["max_concurrency"] = max_concurrency
+            # Resized in place so jobs already holding a slot still count against the new limit
+            self.execution_semaphore.resize(max_concurrency)
+            return max_concurrency
+
+        def ccr_get_http_session(self):
+            """Shared keep-alive session for every HTTP call the runner makes"""
+            if self.http_session is None or self.http_session.closed:
+                connector = aiohttp.TCPConnector(limit=CCR_HTTP_POOL_LIMIT, limit_per_host=CCR_HTTP_PER_HOST_LIMIT, ttl_dns_cache=300, keepalive_timeout=60)
+                self.http_session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+            return self.http_session
+
+        async def ccr_close_http_session(self):
+            if self.http_session and not self.http_session.closed:
+                await self.http_session.close()
+            self.http_session = None
 
         async def ccr_start(self):
             if self.running: return
             self.running = True
+            self.ccr_get_http_session()
+            self.schedule_dirty = True
+            self.ccr_set_max_concurrency(self.state.get("max_concurrency", 3))
             self.scheduler_task = bot.loop.create_task(self.ccr_scheduler_loop())
             self.cleanup_task = bot.loop.create_task(self.ccr_cleanup_pending_responses())
             await self.ccr_log("Runner Started", "The command runner task has started.", color=0x57F287)
             if self.ui_updater: self.ui_updater(self.running)
             ccr_log_to_file("🟢 RUNNER STARTED - All scheduled commands have been started" + "\n", debug_mode=True, important=True)
 
+        async def ccr_warm_slash_definitions(self):
+            """Resolve the definition of every enabled slash command before the first pick, so first runs are cache hits.
+            Commands are grouped by (bot_id, guild) so each definition is looked up once, with at most
+            CCR_WARMUP_CONCURRENCY lookups in flight. Disk-cached definitions are revalidated on first execution,
+            not here. A command that both the server lookup and the bot's
+            fresh global list confirm as missing is auto-disabled; failed lookups are left to the scheduler."""
+            debug_mode = self.state.get("debug_mode", False)
+            groups = {}
+            for (channel_id, main_command, bot_id), cmd in self.slash_command_index.items():
+                if not cmd.get("enabled", True): continue
+                channel = self.ccr_get_channel(channel_id)
+                if not channel: continue
+                group = groups.setdefault((bot_id, ccr_channel_guild_id(channel)), {})
+                group.setdefault(main_command, []).append((channel, cmd))
+            if not groups: return
+            
+            started = time.perf_counter()
+            
+            async def warm(bot_id, main_command, targets):
+                channel, cmd = targets[0]
+                async with self.slash_lookup_semaphore:
+                    try:
+                        slash_cmd = (await ccr_get_slash_definition(channel, bot_id, main_command, cmd, debug_mode, revalidate=False))[0]
+                    except Exception as e:
+                        ccr_log_to_file(f"Warm-up lookup failed for '{main_command}' (bot {bot_id}): {e}", level="ERROR", debug_mode=debug_mode)
+                        return None
+                if slash_cmd:
+                    return True
+                # Only a miss confirmed by both scopes is marked missing; a failed request is left to the scheduler
+                if not self.slash_definitions.is_missing(bot_id, ccr_channel_guild_id(channel), main_command):
+                    return None
+                for target_channel, _ in targets:
+                    await ccr_disable_command_automatically(target_channel.id, main_command, bot_id, debug_mode)
+                return False
+            
+            results = await asyncio.gather(*(warm(bot_id, main_command, targets)
+                                             for (bot_id, _), group in groups.items()
+                                             for main_command, targets in group.items()))
+            resolved, disabled = results.count(True), results.count(False)
+            summary = f"Resolved {resolved}/{len(results)} slash command definitions for {len(groups)} bot/server pairs in {time.perf_counter() - started:.2f}s"
+            if disabled:
+                summary += f", auto-disabled {disabled} missing command(s)"
+            ccr_log_to_file(f"🔥 WARM-UP: {summary}", debug_mode=debug_mode, important=True)
+            await self.ccr_log("Warm-up Complete", summary, color=0xED4245 if disabled else 0x57F287, priority=CCR_LOG_HIGH if disabled else CCR_LOG_LOW)
+
         async def ccr_stop(self):
             if not self.running: return
             self.running = False
             if self.scheduler_task and not self.scheduler_task.done(): self.scheduler_task.cancel()
             if self.cleanup_task and not self.cleanup_task.done(): self.cleanup_task.cancel()
+            self.ccr_cancel_lanes()
             await self.ccr_log("Runner Stopped", "The command runner task has been stopped.", color=0xED4245)
             ccr_log_to_file("🔴 RUNNER STOPPED - All scheduled commands have been stopped" + "\n", debug_mode=True, important=True)
             if self.ui_updater: self.ui_updater(self.running)
@@ -1329,12 +2075,13 @@ def custom_command_runner_script():
                         kwargs[key.strip()] = value.strip()
             return kwargs
 
-        async def ccr_execute_command(self, channel, channel_config, command_profile):
+        async def ccr_execute_command(self, channel, channel_config, command_profile, typing_duration=None, schedule_entry=None):
             channel_id = ccr_channel_id_string(channel.id)
             cmd_key = f"{channel_id}-{command_profile['name']}"
             lock = self.command_locks.setdefault(channel_id, asyncio.Lock())
             if lock.locked(): return False
             async with lock:
+                execution_slot = None
                 try:
                     humanization_config = channel_config.get("humanization") or {}
                     cmd_args = command_profile.get('args', '').strip()
@@ -1342,31 +2089,42 @@ def custom_command_runner_script():
                     cmd_prefix = command_profile.get('prefix', '!')
                     
                     # Typing simulation
+                    typed = 0.0
                     if humanization_config.get("typing", True):
-                        typing_duration = random.uniform(1, 4)
-                        async with channel.typing():
-                            await asyncio.sleep(typing_duration)
+                        if typing_duration is None:
+                            typing_duration = random.uniform(1, 4)
+                        if typing_duration > 0:
+                            with ccr_tracer.span("typing", track=channel.id):
+                                async with channel.typing():
+                                    await asyncio.sleep(typing_duration)
+                            typed = typing_duration
+                    
+                    # Only the send/response phase counts against the global concurrency cap
+                    semaphore = self.execution_semaphore
+                    with ccr_tracer.span("slot_wait", track=channel.id):
+                        await semaphore.acquire()
+                    execution_slot = semaphore
+                    if schedule_entry is not None:
+                        self.ccr_record_lateness(schedule_entry, self.clock.time(), typed)
                     
                     if cmd_type == "slash":
                         target_bot_id = ccr_safe_int(command_profile.get('bot_id', 0))
                         if not target_bot_id:
-                            await self.ccr_log("Execution Error", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Error**: Bot ID is required for slash commands", color=0xED4245)
+                            self.ccr_record_stat(cmd_key, command_profile.get("bot_id"), outcome="error")
+                            await self.ccr_log("Execution Error", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Error**: Bot ID is required for slash commands", color=0xED4245, priority=CCR_LOG_HIGH)
                             return False
                         
+                        nonce = ccr_new_interaction_nonce()
                         try:
                             # Create future for response tracking
                             future = bot.loop.create_future()
-                            self.slash_command_results[str(channel.id)] = future
-
-                            # Register pending slash response
-                            channel_id_str = ccr_channel_id_string(channel.id)
                             async with self.pending_responses_lock:
-                                self.pending_slash_responses[channel_id_str] = {
+                                self.ccr_register_pending_slash(nonce, channel_id, {
                                     "cmd_name": command_profile["name"],
                                     "bot_id": target_bot_id,
                                     "timestamp": time.time(),
                                     "args": command_profile.get("args", "")
-                                }
+                                }, future)
                                                         
                             # Parse arguments for slash command
                             cmd_args = command_profile.get('args', '').strip()
@@ -1376,11 +2134,15 @@ def custom_command_runner_script():
                             
                             # Execute the slash command using 
                             debug_mode = self.state.get('debug_mode', False) if self.state and isinstance(self.state, dict) else False
-                            result = await execute_slash_command_custom(channel, target_bot_id, command_profile['name'], debug_mode=debug_mode, **slash_kwargs)
+                            result = await execute_slash_command_custom(channel, target_bot_id, command_profile['name'], debug_mode=debug_mode, interaction_nonce=nonce, **slash_kwargs)
                             await asyncio.sleep(0.3)
                             
-                            # Check if the command execution was successful
-                            if not result.get('success', False):
+                            if result.get('success', False):
+                                # Direct calls generate their own nonce; bind whatever the interaction reported
+                                async with self.pending_responses_lock:
+                                    nonce = self.ccr_bind_interaction(nonce, result.get("nonce"), result.get("interaction_id"))
+                            else:
+                                # Check if the command execution was successful
                                 response_data = result.get('response') or {}
                                 error_details = response_data.get('error', 'Unknown error') if isinstance(response_data, dict) else 'Unknown error'
                                 status_code = result.get('status_code', 0)
@@ -1389,55 +2151,54 @@ def custom_command_runner_script():
                                 if status_code == 404 and "not found" in error_details.lower():
                                     # Clean up pending response for 404 errors (command not found)
                                     async with self.pending_responses_lock:
-                                        self.pending_slash_responses.pop(str(channel.id), None)
-                                    self.slash_command_results.pop(str(channel.id), None)
-                                    await self.ccr_log("🔴 Command Auto-Disabled", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Bot ID**: {target_bot_id}\n**Reason**: Command not found - automatically disabled to prevent further errors", color=0xFF6B35)
+                                        self.ccr_pop_pending_slash(nonce)
+                                    await self.ccr_log("🔴 Command Auto-Disabled", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Bot ID**: {target_bot_id}\n**Reason**: Command not found - automatically disabled to prevent further errors", color=0xFF6B35, priority=CCR_LOG_HIGH)
                                     return False
                                 elif status_code == 400 and ("10005" in str(response_data) or "unknown integration" in error_details.lower() or "integración desconocida" in error_details.lower()):
-                                    if str(channel.id) in self.pending_slash_responses:
-                                        self.pending_slash_responses[str(channel.id)]["initial_error"] = {
+                                    if nonce in self.pending_slash_responses:
+                                        self.pending_slash_responses[nonce]["initial_error"] = {
                                             "status_code": status_code,
                                             "error_details": error_details
                                         }
                                 else:
                                     # Clean up pending response for other errors
                                     async with self.pending_responses_lock:
-                                        self.pending_slash_responses.pop(str(channel.id), None)
-                                    self.slash_command_results.pop(str(channel.id), None)
-                                    await self.ccr_log("Execution Error", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Status Code**: {status_code}\n**Error**: {error_details}", color=0xED4245)
+                                        self.ccr_pop_pending_slash(nonce)
+                                    self.ccr_record_stat(cmd_key, command_profile.get("bot_id"), outcome="error")
+                                    await self.ccr_log("Execution Error", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Status Code**: {status_code}\n**Error**: {error_details}", color=0xED4245, priority=CCR_LOG_HIGH)
                                     return False
                             
                             try:
                                 # Wait for response via the listener
-                                result = await asyncio.wait_for(future, timeout=15.0)
+                                with ccr_tracer.span("response_wait", track=channel.id, command=command_profile['name']):
+                                    result = await asyncio.wait_for(future, timeout=15.0)
                                 return result
                             except asyncio.TimeoutError:
                                 # Check if we have a stored initial error (like 400/10005) to log instead of timeout
-                                pending_data = self.pending_slash_responses.get(str(channel.id), {})
+                                pending_data = self.pending_slash_responses.get(nonce, {})
                                 initial_error = pending_data.get("initial_error")
                                 
                                 if initial_error:
                                     # Log the original error since command didn't actually execute
                                     status_code = initial_error.get("status_code", 0)
                                     error_details = initial_error.get("error_details", "Unknown error")
-                                    await self.ccr_log("🔴 Bot Not Available", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Bot ID**: {target_bot_id}\n**Reason**: Bot not present in server (Error 10005) - Check if bot is added to server", color=0xFF6B35)
+                                    self.ccr_record_stat(cmd_key, command_profile.get("bot_id"), outcome="error")
+                                    await self.ccr_log("🔴 Bot Not Available", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Bot ID**: {target_bot_id}\n**Reason**: Bot not present in server (Error 10005) - Check if bot is added to server", color=0xFF6B35, priority=CCR_LOG_HIGH)
                                 else:
                                     # Timeout message
+                                    self.ccr_record_stat(cmd_key, target_bot_id, outcome="timeout")
                                     await self.ccr_log("Response Timeout (Slash)", f"No response received for `/{command_profile['name']}` in <#{channel.id}>.", color=0xFEE75C)
-                                
-                                if str(channel.id) in self.pending_slash_responses:
-                                    del self.pending_slash_responses[str(channel.id)]
                                 return False
                             finally:
-                                if str(channel.id) in self.slash_command_results:
-                                    del self.slash_command_results[str(channel.id)]
+                                async with self.pending_responses_lock:
+                                    self.ccr_pop_pending_slash(nonce)
                                     
                         except Exception as e:
                             # Clean up on error
                             async with self.pending_responses_lock:
-                                self.pending_slash_responses.pop(str(channel.id), None)
-                            self.slash_command_results.pop(str(channel.id), None)
-                            await self.ccr_log("Execution Error", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Error**: ```{e}```", color=0xED4245)
+                                self.ccr_pop_pending_slash(nonce)
+                            self.ccr_record_stat(cmd_key, command_profile.get("bot_id"), outcome="error")
+                            await self.ccr_log("Execution Error", f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Error**: ```{e}```", color=0xED4245, priority=CCR_LOG_HIGH)
                             return False
                     else:
                         # Execute prefix command as before
@@ -1450,46 +2211,23 @@ def custom_command_runner_script():
                             # Get the bot_id for this specific command
                             target_bot_id = ccr_safe_int(command_profile.get('bot_id', 0))
                             
-                            # Create check function that validates both channel and bot_id if specified
-                            def check(m):
-                                # Check if message is in the correct channel
-                                if m.channel.id != channel.id:
-                                    return False
-                                
-                                # If bot_id is specified, validate it matches
-                                if target_bot_id:
-                                    # Accept message if author ID matches target_bot_id
-                                    if m.author.id != target_bot_id:
-                                        return False
-                                else:
-                                    # If no specific bot_id, only accept bot messages 
-                                    if not m.author.bot:
-                                        return False
-                                return True
-                            
+                            # Without a bot_id any bot reply in the channel counts
                             start_time = time.time()
-                            reply = await bot.wait_for("message", check=check, timeout=15.0)
+                            with ccr_tracer.span("response_wait", track=channel.id, command=command_profile['name']):
+                                reply = await self.ccr_wait_for_response(channel.id, target_bot_id or None, timeout=15.0)
                             execution_time = time.time() - start_time
+                            self.ccr_record_stat(cmd_key, reply.author.id, latency=execution_time, outcome="response")
                             # Include arguments in log if available
                             args_info = ""
                             if 'args' in command_profile and command_profile['args'].strip():
                                 args_info = f"\n**Arguments**: `{command_profile['args']}`"
                             
                             # Get bot name if available
-                            bot_name = ""
-                            if hasattr(self, 'channels_cfg'):
-                                bot_id_int = ccr_safe_int(str(reply.author.id), 0)
-                                for channel_id, channel_config in self.channels_cfg.get("channels", {}).items():
-                                    for command in channel_config.get("commands", []):
-                                        if command.get("bot_id") == bot_id_int and command.get("bot_name"):
-                                            bot_name = command["bot_name"]
-                                            break
-                                    if bot_name:
-                                        break
+                            bot_name = self.ccr_get_bot_name(reply.author.id)
                             bot_name_info = f"\n**Bot Name**: {bot_name}" if bot_name else ""
                             
                             log_message = f"**Command**: `{command_to_send}`{args_info}\n**Channel**: <#{channel.id}>\n**Bot ID**: {reply.author.id}{bot_name_info}"
-                            await self.ccr_log("Command Executed", log_message, color=0x3498DB, message_obj=reply, execution_time=execution_time)
+                            await self.ccr_log("Command Executed", log_message, color=0x3498DB, message_obj=reply, execution_time=execution_time, priority=CCR_LOG_LOW)
                             
                             debug_mode = self.state.get('debug_mode', False) if self.state and isinstance(self.state, dict) else False
                             ccr_log_to_file(f"✅ Prefix command executed: {command_to_send} in channel {channel.id} (execution time: {execution_time:.3f}s)" + "\n", level="SUCCESS", debug_mode=debug_mode, important=True)
@@ -1497,6 +2235,7 @@ def custom_command_runner_script():
                             return True
                         except asyncio.TimeoutError:
                             # Log timeout 
+                            self.ccr_record_stat(cmd_key, target_bot_id, outcome="timeout")
                             await self.ccr_log("Response Timeout", f"No bot response for `{command_to_send}` in <#{channel.id}>.", color=0xFEE75C)
                             
                             debug_mode = self.state.get('debug_mode', False) if self.state and isinstance(self.state, dict) else False
@@ -1506,92 +2245,199 @@ def custom_command_runner_script():
                 except Exception as e:
                     # Log error
                     error_message = f"**Channel**: <#{channel.id}>\n**Command**: `{command_profile['name']}`\n**Error**: ```{e}```"
-                    await self.ccr_log("Execution Error", error_message, color=0xED4245)
+                    self.ccr_record_stat(cmd_key, command_profile.get("bot_id"), outcome="error")
+                    await self.ccr_log("Execution Error", error_message, color=0xED4245, priority=CCR_LOG_HIGH)
                     
                     debug_mode = self.state.get('debug_mode', False) if self.state and isinstance(self.state, dict) else False
                     ccr_log_to_file(f"❌ Execution error for command {command_profile['name']} in channel {channel.id}: {str(e)}", level="ERROR", debug_mode=debug_mode, important=True)
                     return False
+                finally:
+                    if execution_slot: execution_slot.release()
         
-        async def slash_response_listener(self, message):
-            """Listens for messages and checks if they are a response to a pending slash command."""
-            if not message.author.bot:
+        def ccr_register_pending_slash(self, nonce, channel_id, pending_data, future):
+            pending_data["channel_id"] = channel_id
+            pending_data["nonce"] = nonce
+            self.pending_slash_responses[nonce] = pending_data
+            self.slash_command_results[nonce] = future
+            wait_key = (int(channel_id), pending_data["bot_id"])
+            pending_data["wait_key"] = wait_key
+            if wait_key not in self.pending_slash_waiters:
+                self.pending_slash_waiters[wait_key] = []
+                self.ccr_refresh_watched_channels()
+            self.pending_slash_waiters[wait_key].append(nonce)
+
+        def ccr_refresh_watched_channels(self):
+            self.watched_channel_ids = frozenset(key[0] for key in self.pending_slash_waiters) | frozenset(key[0] for key in self.response_waiters)
+
+        def ccr_add_response_waiter(self, channel_id, author_id=None):
+            """Register a future resolved with the next message from author_id (or any bot) in the channel"""
+            wait_key = (channel_id, author_id)
+            future = bot.loop.create_future()
+            if wait_key not in self.response_waiters:
+                self.response_waiters[wait_key] = []
+                self.ccr_refresh_watched_channels()
+            self.response_waiters[wait_key].append(future)
+            return future
+
+        def ccr_remove_response_waiter(self, channel_id, author_id, future):
+            wait_key = (channel_id, author_id)
+            waiters = self.response_waiters.get(wait_key)
+            if waiters is None:
+                return
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                del self.response_waiters[wait_key]
+                self.ccr_refresh_watched_channels()
+
+        async def ccr_wait_for_response(self, channel_id, author_id=None, timeout=15.0):
+            """Dispatcher-backed replacement for bot.wait_for("message") with a channel/author check"""
+            future = self.ccr_add_response_waiter(channel_id, author_id)
+            try:
+                return await asyncio.wait_for(future, timeout=timeout)
+            finally:
+                self.ccr_remove_response_waiter(channel_id, author_id, future)
+
+        def ccr_resolve_response_waiter(self, message):
+            wait_keys = [(message.channel.id, message.author.id)]
+            if message.author.bot:
+                wait_keys.append((message.channel.id, None))
+            for wait_key in wait_keys:
+                for future in self.response_waiters.get(wait_key, ()):
+                    if not future.done():
+                        future.set_result(message)
+                        return True
+            return False
+
+        async def ccr_dispatch_message(self, message):
+            """Single on_message entry point: one lookup per message for slash and prefix responses"""
+            if message.channel.id not in self.watched_channel_ids:
+                return
+            if await self.slash_response_listener(message):
+                return
+            self.ccr_resolve_response_waiter(message)
+
+        def ccr_bind_interaction(self, nonce, interaction_nonce=None, interaction_id=None):
+            """Attach the interaction id (and the library's nonce for direct calls) to a pending slash command.
+            Returns the nonce the entry is keyed by afterwards."""
+            pending_data = self.pending_slash_responses.get(nonce)
+            if not pending_data:
+                return nonce
+            if interaction_nonce and interaction_nonce != nonce:
+                self.pending_slash_responses[interaction_nonce] = self.pending_slash_responses.pop(nonce)
+                future = self.slash_command_results.pop(nonce, None)
+                if future:
+                    self.slash_command_results[interaction_nonce] = future
+                channel_nonces = self.pending_slash_waiters.get(pending_data["wait_key"], [])
+                if nonce in channel_nonces:
+                    channel_nonces[channel_nonces.index(nonce)] = interaction_nonce
+                pending_data["nonce"] = nonce = interaction_nonce
+            if interaction_id:
+                pending_data["interaction_id"] = str(interaction_id)
+                self.pending_interaction_ids[str(interaction_id)] = nonce
+            return nonce
+
+        def ccr_pop_pending_slash(self, nonce):
+            """Remove a pending slash command from every index; the caller resolves its future"""
+            pending_data = self.pending_slash_responses.pop(nonce, None)
+            future = self.slash_command_results.pop(nonce, None)
+            if pending_data:
+                self.pending_interaction_ids.pop(pending_data.get("interaction_id"), None)
+                channel_nonces = self.pending_slash_waiters.get(pending_data["wait_key"])
+                if channel_nonces is not None:
+                    if nonce in channel_nonces:
+                        channel_nonces.remove(nonce)
+                    if not channel_nonces:
+                        del self.pending_slash_waiters[pending_data["wait_key"]]
+                        self.ccr_refresh_watched_channels()
+            return pending_data, future
+
+        async def interaction_listener(self, interaction):
+            """Map the nonce of an interaction we sent to the interaction id Discord assigned"""
+            nonce = getattr(interaction, 'nonce', None)
+            if nonce is None or not getattr(interaction, 'id', None):
                 return
+            if str(nonce) in self.pending_slash_responses:
+                async with self.pending_responses_lock:
+                    self.ccr_bind_interaction(str(nonce), interaction_id=interaction.id)
+
+        def ccr_match_pending_slash(self, message):
+            """Find the nonce of the pending slash command a bot message answers.
+            Tries the interaction id first, then the command name, then the cooldown embed text
+            (only when a single command to that bot is waiting in the channel)."""
+            message_interaction = getattr(message, 'interaction_metadata', None) or getattr(message, 'interaction', None)
+            if message_interaction is not None:
+                nonce = self.pending_interaction_ids.get(str(getattr(message_interaction, 'id', '')))
+                if nonce:
+                    return nonce
+            
+            candidates = self.pending_slash_waiters.get((message.channel.id, message.author.id))
+            if not candidates:
+                return None
+            
+            legacy_interaction = getattr(message, 'interaction', None)
+            if legacy_interaction is not None and legacy_interaction.user.id == bot.user.id:
+                interaction_id = str(getattr(legacy_interaction, 'id', ''))
+                for nonce in candidates:
+                    pending = self.pending_slash_responses[nonce]
+                    # An entry already bound to another interaction is not this one
+                    if pending.get("interaction_id") not in (None, interaction_id):
+                        continue
+                    if legacy_interaction.name == pending["cmd_name"]:
+                        return nonce
+            
+            if message.embeds and len(candidates) == 1:
+                embed_desc = (message.embeds[0].description or "").lower()
+                if "you can next" in embed_desc or "you cannot" in embed_desc:
+                    return candidates[0]
+            return None
+
+        async def slash_response_listener(self, message):
+            """Checks if a message is a response to a pending slash command; returns True when it was consumed."""
+            if not message.author.bot or not self.pending_slash_waiters:
+                return False
+            
             async with self.pending_responses_lock:
-                if not self.pending_slash_responses:
-                    return
-                channel_id_str = ccr_channel_id_string(message.channel.id)
-            # Check if we are waiting for a response in this channel
-            if channel_id_str in self.pending_slash_responses:
-                pending = self.pending_slash_responses[channel_id_str]
+                nonce = self.ccr_match_pending_slash(message)
+                if not nonce:
+                    return False
+                pending_data, future = self.ccr_pop_pending_slash(nonce)
+            if not pending_data or not isinstance(pending_data, dict): 
+                return False
+
+            try:
+                # Calculate execution time from when command was initiated
+                timestamp = pending_data.get('timestamp')
+                if timestamp is not None and isinstance(timestamp, (int, float)):
+                    execution_time = time.time() - timestamp
+                    # Ensure execution_time is not negative
+                    execution_time = max(0, execution_time)
+                else:
+                    execution_time = 0  # Default to 0 if timestamp is invalid
+                self.ccr_record_stat(ccr_command_key(pending_data["channel_id"], pending_data.get("cmd_name", "")), message.author.id, latency=execution_time, outcome="response")
                 
-                # Safety check: ensure pending is not None and has required keys
-                if not pending or not isinstance(pending, dict) or "bot_id" not in pending or "cmd_name" not in pending:
-                    return
+                # Log the successful response
+                command_to_send = f"/{pending_data.get('cmd_name', 'unknown')}"
+                args_info = ""
+                if 'args' in pending_data and pending_data.get('args', '').strip():
+                    args_info = f"\n**Arguments**: `{pending_data['args']}`"
                 
-                if message.author.id != pending["bot_id"]:
-                    return
-
-                should_process = False
-                if (message.interaction is not None and
-                    message.interaction.user.id == bot.user.id and
-                    message.interaction.name == pending["cmd_name"]):
-                    should_process = True
+                # Get bot name if available
+                bot_name = self.ccr_get_bot_name(message.author.id)
+                bot_name_info = f"\n**Bot Name**: {bot_name}" if bot_name else ""
                 
-                elif message.embeds:
-                    embed_desc = message.embeds[0].description or ""
-                    if "you can next" in embed_desc.lower() or "you cannot" in embed_desc.lower():
-                        should_process = True
-
-                if should_process:
-                    async with self.pending_responses_lock:
-                        pending_data = self.pending_slash_responses.pop(channel_id_str, None)
-                    if not pending_data or not isinstance(pending_data, dict): 
-                        return
-
-                    try:
-                        # Calculate execution time from when command was initiated
-                        timestamp = pending_data.get('timestamp')
-                        if timestamp is not None and isinstance(timestamp, (int, float)):
-                            execution_time = time.time() - timestamp
-                            # Ensure execution_time is not negative
-                            execution_time = max(0, execution_time)
-                        else:
-                            execution_time = 0  # Default to 0 if timestamp is invalid
-                        
-                        # Log the successful response
-                        command_to_send = f"/{pending_data.get('cmd_name', 'unknown')}"
-                        args_info = ""
-                        if 'args' in pending_data and pending_data.get('args', '').strip():
-                            args_info = f"\n**Arguments**: `{pending_data['args']}`"
-                        
-                        # Get bot name if available
-                        bot_name = ""
-                        if hasattr(self, 'channels_cfg'):
-                            bot_id_int = ccr_safe_int(str(message.author.id), 0)
-                            for channel_id, channel_config in self.channels_cfg.get("channels", {}).items():
-                                for command in channel_config.get("commands", []):
-                                    if command.get("bot_id") == bot_id_int and command.get("bot_name"):
-                                        bot_name = command["bot_name"]
-                                        break
-                                if bot_name:
-                                    break
-                        bot_name_info = f"\n**Bot Name**: {bot_name}" if bot_name else ""
-                        
-                        log_message = f"**Command**: `{command_to_send}`{args_info}\n**Channel**: <#{message.channel.id}>\n**Bot ID**: {message.author.id}{bot_name_info}"
-                        await self.ccr_log("Command Executed", log_message, color=0x3498DB, message_obj=message, execution_time=execution_time)
-                        
-                        debug_mode = self.state.get('debug_mode', False) if self.state and isinstance(self.state, dict) else False
-                        
-                        future = self.slash_command_results.get(channel_id_str)
-                        if future and not future.done():
-                            future.set_result(True)
-                    except Exception as e:
-                        debug_mode = self.state.get('debug_mode', False) if self.state and isinstance(self.state, dict) else False
-                        ccr_log_to_file(f"❌ Error in slash response listener: {str(e)}", level="ERROR", debug_mode=debug_mode, important=True)
+                log_message = f"**Command**: `{command_to_send}`{args_info}\n**Channel**: <#{message.channel.id}>\n**Bot ID**: {message.author.id}{bot_name_info}"
+                await self.ccr_log("Command Executed", log_message, color=0x3498DB, message_obj=message, execution_time=execution_time, priority=CCR_LOG_LOW)
+                
+                if future and not future.done():
+                    future.set_result(True)
+            except Exception as e:
+                debug_mode = self.state.get('debug_mode', False) if self.state and isinstance(self.state, dict) else False
+                ccr_log_to_file(f"❌ Error in slash response listener: {str(e)}", level="ERROR", debug_mode=debug_mode, important=True)
 
-                        future = self.slash_command_results.get(channel_id_str)
-                        if future and not future.done():
-                            future.set_exception(e)
+                if future and not future.done():
+                    future.set_exception(e)
+            return True
 
         async def ccr_shutdown(self):
             self.running = False
@@ -1599,6 +2445,21 @@ def custom_command_runner_script():
                 self.scheduler_task.cancel()
             if self.cleanup_task and not self.cleanup_task.done():
                 self.cleanup_task.cancel()
+            self.ccr_cancel_lanes()
+            # Flush a pending background config save right away
+            if self.channels_save_task and not self.channels_save_task.done():
+                self.channels_save_task.cancel()
+                await asyncio.gather(self.channels_save_task, return_exceptions=True)
+                self.channels_save_dirty = False
+                await ccr_save_json_data(CCR_CHANNELS_FILE, copy.deepcopy(self.channels_cfg))
+            if self.slash_cache_save_task and not self.slash_cache_save_task.done():
+                self.slash_cache_save_task.cancel()
+                await ccr_save_json_data(CCR_SLASH_CACHE_FILE, self.slash_definitions.export())
+            # Fold pending journal entries into the snapshot
+            if self.journal_entries:
+                await self.ccr_save_state()
+            await self.ccr_stop_log_sender()
+            await self.ccr_close_http_session()
 
         async def ccr_cleanup_pending_responses(self):
             """Clean up stale pending slash responses every 5 minutes"""
@@ -1611,26 +2472,21 @@ def custom_command_runner_script():
                     current_time = time.time()
                     
                     async with self.pending_responses_lock:
-                        stale_channels = []
                         # Find responses older than 30 seconds
-                        for channel_id, pending_data in self.pending_slash_responses.items():
-                            if current_time - pending_data.get("timestamp", 0) > 30:
-                                stale_channels.append(channel_id)
+                        stale_nonces = [nonce for nonce, pending_data in self.pending_slash_responses.items()
+                                        if current_time - pending_data.get("timestamp", 0) > 30]
+                        # Also clean up stale slash_command_results
+                        stale_nonces += [nonce for nonce, future in self.slash_command_results.items()
+                                         if nonce not in self.pending_slash_responses and future.done()]
+                        removed = [self.ccr_pop_pending_slash(nonce)[0] for nonce in stale_nonces]
                         
-                    # Clean up stale responses
-                    for channel_id in stale_channels:
-                        removed_data = self.pending_slash_responses.pop(channel_id, None)
+                    for removed_data in removed:
                         if removed_data:
-                            await self.ccr_log("Cleanup", f"Removed stale pending response for /{removed_data['cmd_name']} in <#{channel_id}>", debug_mode=True)
+                            await self.ccr_log("Cleanup", f"Removed stale pending response for /{removed_data['cmd_name']} in <#{removed_data['channel_id']}>", debug_mode=True)
                     
-                    # Also clean up stale slash_command_results
-                    stale_results = []
-                    for channel_id, future in self.slash_command_results.items():
-                        if future.done() or future.cancelled():
-                            stale_results.append(channel_id)
-                    
-                    for channel_id in stale_results:
-                        self.slash_command_results.pop(channel_id, None)
+                    # Periodic compaction of the last_used journal
+                    if self.journal_entries:
+                        await self.ccr_save_state()
                         
                 except asyncio.CancelledError:
                     break
@@ -1638,62 +2494,259 @@ def custom_command_runner_script():
                     await self.ccr_log("Cleanup Error", f"Error in cleanup task: {e}", color=0xED4245, debug_mode=True)
                     await asyncio.sleep(60)
 
-        def ccr_trigger_reschedule(self): self.reschedule_event.set()
+        def ccr_trigger_reschedule(self, channel_id=None, command_profile=None):
+            """Wake the scheduler after a config change.
+            With a channel_id and command_profile only that command's heap entry is updated,
+            otherwise the whole schedule is rebuilt on the next scheduler iteration.
+            """
+            if channel_id is not None and command_profile is not None:
+                self.ccr_schedule_command(ccr_channel_id_string(channel_id), command_profile)
+            else:
+                self.schedule_dirty = True
+            self.reschedule_event.set()
+
+        def ccr_compute_next_run(self, channel_id, command_profile):
+            last_used = self.state.get("last_used", {}) if isinstance(self.state, dict) else {}
+            last_run_time_raw = last_used.get(ccr_command_key(channel_id, command_profile.get("name", "")), 0)
+            last_run_time = float(last_run_time_raw) if last_run_time_raw != 0 else 0
+            return last_run_time + command_profile.get("cooldown", 600)
+
+        def ccr_plan_humanization(self, channel_id):
+            """Pick the human delay and typing duration for a job when it is enqueued"""
+            chan_conf = self.channels_cfg.get("channels", {}).get(channel_id) or {}
+            humanization_config = chan_conf.get("humanization") or {}
+            human_delay = humanization_config.get("human_delay") or {}
+            delay = random.uniform(human_delay.get("min", 5), human_delay.get("max", 45)) if human_delay.get("enabled", True) else 0
+            typing_duration = random.uniform(1, 4) if humanization_config.get("typing", True) else 0
+            return delay, typing_duration
+
+        def ccr_make_schedule_entry(self, channel_id, command_profile, cmd_key, next_run_time=None):
+            """Build a heap entry, or None when the command's timer window never opens"""
+            due_time = self.ccr_compute_next_run(channel_id, command_profile) if next_run_time is None else next_run_time
+            # Next run is max(cooldown expiry, next time the timer window opens)
+            now = self.clock.time()
+            due_time = ccr_compile_timer(command_profile.get("timer", {}))(max(due_time, now))
+            if due_time is None:
+                return None
+            human_delay, typing_duration = self.ccr_plan_humanization(channel_id)
+            # Overdue commands start one human delay from now, like a freshly picked job
+            start_time = max(due_time, now) + human_delay
+            # A delay longer than what is left of the window would push every start past its end; shrink it to fit
+            while human_delay and not ccr_is_within_timer(command_profile.get("timer", {}), start_time):
+                human_delay = human_delay / 2 if human_delay >= 1 else 0
+                start_time = max(due_time, now) + human_delay
+            self.schedule_seq += 1
+            return [start_time, self.schedule_seq, cmd_key, channel_id, command_profile, due_time, human_delay, typing_duration]
+
+        def ccr_schedule_command(self, channel_id, command_profile, next_run_time=None):
+            """Insert or replace the heap entry of a single command (O(log N))"""
+            cmd_key = ccr_command_key(channel_id, command_profile.get("name", ""))
+            if not command_profile.get("enabled", True):
+                self.schedule_entries.pop(cmd_key, None)
+                return
+            entry = self.ccr_make_schedule_entry(channel_id, command_profile, cmd_key, next_run_time)
+            if entry is None:
+                self.schedule_entries.pop(cmd_key, None)
+                return
+            self.schedule_entries[cmd_key] = entry
+            heapq.heappush(self.schedule_heap, entry)
+            # Compact once superseded entries dominate the heap
+            if len(self.schedule_heap) > 2 * len(self.schedule_entries) + 64:
+                self.schedule_heap = list(self.schedule_entries.values())
+                heapq.heapify(self.schedule_heap)
+
+        def ccr_rebuild_schedule(self):
+            self.schedule_dirty = False
+            self.schedule_entries = {}
+            for channel_id, cfg in self.channels_cfg.get("channels", {}).items():
+                for cmd in cfg.get("commands", []):
+                    if not cmd.get("enabled", True): continue
+                    cmd_key = ccr_command_key(channel_id, cmd.get("name", ""))
+                    # In-flight commands are re-added by their lane once they finish
+                    if cmd_key in self.inflight_jobs: continue
+                    entry = self.ccr_make_schedule_entry(channel_id, cmd, cmd_key)
+                    if entry is not None:
+                        self.schedule_entries[cmd_key] = entry
+            self.schedule_heap = list(self.schedule_entries.values())
+            heapq.heapify(self.schedule_heap)
+
+        def ccr_peek_schedule(self):
+            """Return the earliest live heap entry, dropping superseded ones"""
+            while self.schedule_heap:
+                entry = self.schedule_heap[0]
+                if self.schedule_entries.get(entry[2]) is entry:
+                    return entry
+                heapq.heappop(self.schedule_heap)
+            return None
+
+        def ccr_get_channel(self, channel_id):
+            return bot.get_channel(int(channel_id))
+
+        def ccr_get_lane(self, channel_id):
+            lane = self.lanes.get(channel_id)
+            if not lane or lane["task"].done():
+                lane = {"queue": asyncio.Queue()}
+                self.lanes[channel_id] = lane
+                lane["task"] = bot.loop.create_task(self.ccr_lane_worker(channel_id, lane["queue"]))
+            return lane
+
+        def ccr_cancel_lanes(self):
+            for lane in self.lanes.values():
+                if not lane["task"].done(): lane["task"].cancel()
+            self.lanes = {}
+
+        async def ccr_lane_worker(self, channel_id, lane_queue):
+            """Runs the jobs of one channel in order; lanes of different channels run in parallel"""
+            while self.running:
+                try:
+                    entry = await lane_queue.get()
+                    await self.ccr_run_job(entry)
+                    await self.clock.sleep(random.uniform(3, 7))
+                except asyncio.CancelledError: break
+                except Exception as e:
+                    await self.ccr_log("Lane Error", f"**Channel**: <#{channel_id}>\n```{e}```", color=0x992D22, priority=CCR_LOG_HIGH)
+                    await self.clock.sleep(5)
+
+        async def ccr_run_job(self, entry):
+            cmd_key, config_channel_id, cmd_prof = entry[2:5]
+            typing_duration = entry[7]
+            try:
+                channel = self.ccr_get_channel(config_channel_id)
+                chan_conf = self.channels_cfg.get("channels", {}).get(config_channel_id)
+                if channel and chan_conf is not None:
+                    # The human delay is already part of the entry's start time; lateness is recorded once a slot is held
+                    # Always update last_used to respect cooldown, regardless of execution result
+                    execution_result = await self.ccr_execute_command(channel, chan_conf, cmd_prof, typing_duration=typing_duration, schedule_entry=entry)
+                    # Update last_used timestamp to prevent immediate re-execution on failure
+                    await self.ccr_record_last_used(cmd_key, self.clock.time())
+            finally:
+                self.inflight_jobs.discard(cmd_key)
+                # Prefer a profile re-added by an edit made while the job was running
+                current = self.schedule_entries.get(cmd_key)
+                profile = current[4] if current else cmd_prof
+                commands = (self.channels_cfg.get("channels", {}).get(config_channel_id) or {}).get("commands", [])
+                if not any(cmd is profile for cmd in commands):
+                    # Saving the config replaces the command dicts; find the command again by its key
+                    profile = next((cmd for cmd in commands if ccr_command_key(config_channel_id, cmd.get("name", "")) == cmd_key), None)
+                if profile is not None:
+                    self.ccr_schedule_command(config_channel_id, profile)
+                self.reschedule_event.set()
+
         async def ccr_scheduler_loop(self):
+            # Warm the definition cache first so auto-disabled commands never reach the heap
+            try:
+                await self.ccr_warm_slash_definitions()
+            except Exception as e:
+                await self.ccr_log("Warm-up Error", f"```{e}```", color=0x992D22, priority=CCR_LOG_HIGH)
             while self.running:
                 # Ensure state is properly initialized
                 if not self.state or not isinstance(self.state, dict):
-                    await asyncio.sleep(10)
+                    await self.clock.sleep(10)
                     continue
-                last_used = self.state.get("last_used", {})
                 try:
                     if not self.channels_cfg.get("channels"): await self.ccr_stop(); break
-                    next_command_to_run, earliest_run_time = None, float('inf')
-                    for channel_id, cfg in self.channels_cfg.get("channels", {}).items():
-                        for cmd in cfg.get("commands", []):
-                            if not cmd.get("enabled", True): continue
-                            
-                            # Check if command is within its timer time
-                            timer_config = cmd.get("timer", {})
-                            if not ccr_is_within_timer(timer_config): continue
-                            
-                            cmd_key = f"{channel_id}-{cmd['name']}"
-                            last_run_time_raw = last_used.get(cmd_key, 0)
-                            last_run_time = float(last_run_time_raw) if last_run_time_raw != 0 else 0
-                            next_run_time = last_run_time + cmd.get("cooldown", 600)
-                            if next_run_time < earliest_run_time:
-                                earliest_run_time = next_run_time
-                                next_command_to_run = {"channel_id": channel_id, "command_profile": cmd}
-                    if not next_command_to_run: await asyncio.sleep(10); continue
-                    sleep_duration = max(0, earliest_run_time - time.time())
+                    if self.schedule_dirty: self.ccr_rebuild_schedule()
+                    entry = self.ccr_peek_schedule()
+                    # With nothing scheduled, sleep until a config change wakes us
+                    sleep_duration = None if entry is None else max(0, entry[0] - self.clock.time())
                     try:
-                        await asyncio.wait_for(self.reschedule_event.wait(), timeout=sleep_duration)
+                        await self.clock.wait_for(self.reschedule_event.wait(), sleep_duration)
                         self.reschedule_event.clear()
                         continue
                     except asyncio.TimeoutError: pass
                     if not self.running: break
-                    channel_id = ccr_channel_id_string(next_command_to_run["channel_id"])
-                    channel = bot.get_channel(int(channel_id))
-                    if channel:
-                        chan_conf = self.channels_cfg["channels"][next_command_to_run["channel_id"]]
-                        cmd_prof = next_command_to_run["command_profile"]
-                        humanization_config = chan_conf.get("humanization") or {}
-                        human_delay = humanization_config.get("human_delay") or {}
-                        if human_delay.get("enabled", True):
-                            await asyncio.sleep(random.uniform(human_delay.get("min", 5), human_delay.get("max", 45)))
-                        # Always update last_used to respect cooldown, regardless of execution result
-                        cmd_key = f"{channel.id}-{cmd_prof['name']}"
-                        execution_result = await self.ccr_execute_command(channel, chan_conf, cmd_prof)
-                        # Update last_used timestamp to prevent immediate re-execution on failure
-                        self.state["last_used"][cmd_key] = time.time()
-                        await self.ccr_save_state()
-                    await asyncio.sleep(random.uniform(3, 7))
+                    if entry is None or self.schedule_entries.get(entry[2]) is not entry: continue
+                    cmd_key, config_channel_id, cmd_prof = entry[2:5]
+                    # The human delay can push a start past the window's end; move it to the next opening
+                    if not ccr_is_within_timer(cmd_prof.get("timer", {}), self.clock.time()):
+                        self.ccr_schedule_command(config_channel_id, cmd_prof)
+                        continue
+                    # Hand the job to its channel lane; the lane puts it back on the heap when done
+                    del self.schedule_entries[cmd_key]
+                    if cmd_key in self.inflight_jobs: continue
+                    self.inflight_jobs.add(cmd_key)
+                    self.ccr_get_lane(config_channel_id)["queue"].put_nowait(entry)
                 except asyncio.CancelledError: break
                 except Exception as e:
-                    await self.ccr_log("Scheduler CRITICAL ERROR", f"```{e}```", color=0x992D22)
-                    await asyncio.sleep(5)
+                    await self.ccr_log("Scheduler CRITICAL ERROR", f"```{e}```", color=0x992D22, priority=CCR_LOG_HIGH)
+                    await self.clock.sleep(5)
+            self.running = False
+
+    class CcrDryRunManager(CommandRunnerManager):
+        """Runs a copy of the live schedule on a CcrVirtualClock with a no-op executor.
+        Nothing is sent, persisted or logged to the webhook."""
+        def __init__(self, source, start_time=None):
+            super().__init__()
+            self.clock = CcrVirtualClock(time.time() if start_time is None else start_time)
+            self.channels_cfg = copy.deepcopy(source.channels_cfg)
+            self.state = {
+                "last_used": dict(source.state.get("last_used", {})),
+                "max_concurrency": source.state.get("max_concurrency", 3)
+            }
+            # (start, channel_id, command name, lateness) per simulated execution
+            self.timeline = []
+            self.channel_busy = {}
+            self.active_executions = 0
+            self.peak_concurrency = 0
+            self.peak_concurrency_at = None
+
+        def ccr_get_channel(self, channel_id):
+            # Commands are never sent, so the channel id stands in for the channel object
+            return ccr_channel_id_string(channel_id)
+
+        def ccr_record_lateness(self, entry, started_at, typing_duration=0.0):
+            lateness = super().ccr_record_lateness(entry, started_at, typing_duration)
+            self.timeline.append((started_at, entry[3], entry[4].get("name", ""), lateness))
+            return lateness
+
+        async def ccr_execute_command(self, channel, channel_config, command_profile, typing_duration=None, schedule_entry=None):
+            """Hold a concurrency slot for an assumed response time instead of sending anything"""
+            await self.clock.sleep(typing_duration or 0)
+            async with self.execution_semaphore:
+                if schedule_entry is not None:
+                    self.ccr_record_lateness(schedule_entry, self.clock.time(), typing_duration or 0)
+                self.active_executions += 1
+                if self.active_executions > self.peak_concurrency:
+                    self.peak_concurrency = self.active_executions
+                    self.peak_concurrency_at = self.clock.time()
+                try:
+                    await self.clock.sleep(CCR_DRYRUN_RESPONSE_SECONDS)
+                finally:
+                    self.active_executions -= 1
+            self.channel_busy[channel] = self.channel_busy.get(channel, 0.0) + (typing_duration or 0) + CCR_DRYRUN_RESPONSE_SECONDS
+            return True
+
+        async def ccr_record_last_used(self, cmd_key, timestamp):
+            self.state.setdefault("last_used", {})[cmd_key] = timestamp
+
+        async def ccr_save_state(self):
+            pass
+
+        async def ccr_warm_slash_definitions(self):
+            pass
+
+        def ccr_schedule_slash_cache_save(self, delay=5.0):
+            pass
+
+        async def ccr_log(self, *args, **kwargs):
+            pass
+
+        async def ccr_stop(self):
             self.running = False
 
+        async def ccr_dry_run(self, duration):
+            """Simulate `duration` seconds of scheduling and return the timeline"""
+            self.running = True
+            self.ccr_set_max_concurrency(self.state.get("max_concurrency", 3))
+            self.scheduler_task = bot.loop.create_task(self.ccr_scheduler_loop())
+            try:
+                await self.clock.run_until(self.clock.time() + duration)
+            finally:
+                self.running = False
+                self.scheduler_task.cancel()
+                self.ccr_cancel_lanes()
+            return self.timeline
+
     def create_command_runner_ui(ccr_tab):
         ccr_ui_elements = {}
         ccr_manager_ref = lambda: bot._command_runner_manager
@@ -2441,6 +3494,9 @@ def custom_command_runner_script():
             for i, new_cmd in enumerate(new_commands):
                 if i < len(existing_commands):
                     old_cmd = existing_commands[i]
+                    # A re-enabled command gets a fresh lookup instead of a cached "not found"
+                    if new_cmd.get("enabled", True) and not old_cmd.get("enabled", True):
+                        manager.ccr_forget_missing_command(new_cmd)
                     old_cooldown = old_cmd.get("cooldown", 600)
                     new_cooldown = new_cmd.get("cooldown", 600)
                     
@@ -2566,11 +3622,19 @@ def custom_command_runner_script():
                 manager = CommandRunnerManager()
                 bot._command_runner_manager = manager
                 
-                # Register the slash response listener
+                # Register the response listener for slash and prefix replies
                 @bot.listen("on_message")
-                async def ccr_slash_response_listener(message):
+                async def ccr_response_listener(message):
+                    current_manager = getattr(bot, '_command_runner_manager', None)
+                    # Lock-free pre-filter: most messages are in channels with nothing pending
+                    if current_manager and message.channel.id in current_manager.watched_channel_ids:
+                        await current_manager.ccr_dispatch_message(message)
+                
+                # Maps the nonce of each interaction we send to the interaction id Discord assigns
+                @bot.listen("on_interaction")
+                async def ccr_interaction_listener(interaction):
                     if hasattr(bot, '_command_runner_manager') and bot._command_runner_manager:
-                        await bot._command_runner_manager.slash_response_listener(message)
+                        await bot._command_runner_manager.interaction_listener(interaction)
                 
                 manager.ccr_set_ui_elements(ccr_ui_elements)
                 await manager.ccr_load_initial_data()
@@ -2591,7 +3655,7 @@ def custom_command_runner_script():
     ccr_log_to_file("AutoCommander script started", "INFO", debug_mode=True, important=True)
 
     # Bot command for listing command configurations
-    @bot.command(name="ccr", aliases=["crr"], usage="[p]ccr <help|list|start|stop|edit>")
+    @bot.command(name="ccr", aliases=["crr"], usage="[p]ccr <help|list|start|stop|edit|concurrency|stats|trace|dryrun|api>")
     async def ccr_handler(ctx, *, args: str = ""):
         if not hasattr(bot, '_command_runner_manager'):
             await ctx.send("Command Runner Manager is not ready. Please reload scripts.", delete_after=10)
@@ -2640,17 +3704,14 @@ def custom_command_runner_script():
                 enabled_commands = [cmd for cmd in custom_commands if cmd.get("enabled", True)]
                 
                 for cmd in enabled_commands:
-                    # Check if command is within its timer time
-                    timer_config = cmd.get("timer", {})
-                    if not ccr_is_within_timer(timer_config):
-                        continue  # Skip commands that are outside their timer window
-                    
                     cmd_key = f"{cid}-{cmd.get('name', '')}"
                     cooldown = cmd.get("cooldown", 600)
                     last_run_time_raw = last_used.get(cmd_key, 0)
                     last_run_time = float(last_run_time_raw) if last_run_time_raw != 0 else 0
                     next_run = current_time if last_run_time == 0 else last_run_time + cooldown
-                    if next_run < earliest_next_run:
+                    # Account for the timer window opening later than the cooldown expires
+                    next_run = ccr_compile_timer(cmd.get("timer", {}))(max(next_run, current_time))
+                    if next_run is not None and next_run < earliest_next_run:
                         earliest_next_run = next_run
                 try:
                     earliest_next_run_float = float(earliest_next_run)
@@ -2659,6 +3720,11 @@ def custom_command_runner_script():
                     next_exec_str = "**Next execution**: `N/A (invalid time)`"
                 
                 channel_details_lines.append(f"\n- **Channel**: {channel_name} ({cid})")
+                lateness_summary = manager.ccr_lateness_summary(cid)
+                if lateness_summary:
+                    next_exec_str += (f" | **Lateness** (last {lateness_summary['count']}): avg {ccr_format_seconds(lateness_summary['avg'])}, "
+                                      f"p95 {ccr_format_seconds(lateness_summary['p95'])}, max {ccr_format_seconds(lateness_summary['max'])} "
+                                      f"(+{lateness_summary['human_delay_avg']:.0f}s human delay)")
                 channel_details_lines.append(f"  - **Info**: {next_exec_str}")
                 
                 # Humanization settings 
@@ -2696,8 +3762,9 @@ def custom_command_runner_script():
                         else:
                             # Check if command is within its timer time
                             timer_config = cmd.get("timer", {})
-                            if not ccr_is_within_timer(timer_config):
-                                cooldown_remaining = "Outside timer window"
+                            if not ccr_is_within_timer(timer_config, current_time):
+                                window_opens = ccr_compile_timer(timer_config)(current_time)
+                                cooldown_remaining = f"Outside timer window (opens <t:{int(window_opens)}:R>)" if window_opens else "Outside timer window"
                             else:
                                 last_run_time_raw = last_used.get(cmd_key, 0)
                                 # Ensure last_run_time is a float 
@@ -2770,6 +3837,7 @@ def custom_command_runner_script():
                 current_debug = manager.state.get("debug_mode", False)
                 new_debug = not current_debug
                 manager.state["debug_mode"] = new_debug
+                ccr_log_sink.debug_mode = new_debug
                 await manager.ccr_save_state()
                 
                 status = "enabled" if new_debug else "disabled"
@@ -2779,6 +3847,173 @@ def custom_command_runner_script():
                 await ctx.send(f"❌ Error toggling debug mode: {str(e)}", delete_after=10)
                 return
         
+        elif subcommand == "stats":
+            # Latency / timeout / lateness report from the in-memory histograms
+            if len(parts) > 1 and parts[1].lower() == "reset":
+                manager.command_stats.clear()
+                manager.bot_stats.clear()
+                await ctx.send("✅ Command Runner statistics cleared.", delete_after=10)
+                return
+            
+            if not manager.command_stats:
+                await ctx.send("📊 No statistics recorded yet.", delete_after=15)
+                return
+            
+            def stats_line(stats):
+                line = (f"n={stats.attempts} | p50 {ccr_format_seconds(stats.latency.percentile(50))} "
+                        f"p95 {ccr_format_seconds(stats.latency.percentile(95))} p99 {ccr_format_seconds(stats.latency.percentile(99))} "
+                        f"| timeouts {stats.timeout_rate() * 100:.0f}%")
+                if stats.errors:
+                    line += f" | errors {stats.errors}"
+                if stats.lateness.count:
+                    line += f" | late p95 {ccr_format_seconds(stats.lateness.percentile(95))}"
+                if stats.auto_disabled:
+                    line += f" | auto-disabled {stats.auto_disabled}"
+                return line
+            
+            def sort_key(item):
+                return -(item[1].latency.percentile(95) or 0), -item[1].timeouts
+            
+            output_lines = ["**Command Runner Stats** (since last reload, slowest first)", "", "**Commands**:"]
+            for cmd_key, stats in sorted(manager.command_stats.items(), key=sort_key)[:15]:
+                stat_channel_id, _, stat_cmd_name = cmd_key.partition("-")
+                output_lines.append(f"- <#{stat_channel_id}> `{stat_cmd_name}`: {stats_line(stats)}")
+            if manager.bot_stats:
+                output_lines += ["", "**Bots**:"]
+                for stat_bot_id, stats in sorted(manager.bot_stats.items(), key=sort_key)[:10]:
+                    bot_name = manager.ccr_get_bot_name(ccr_safe_int(stat_bot_id)) or stat_bot_id
+                    output_lines.append(f"- `{bot_name}`: {stats_line(stats)}")
+            
+            output_message = ""
+            for line in output_lines:
+                if len(output_message) + len(line) > 1900:
+                    await ctx.send(output_message, delete_after=60)
+                    output_message = ""
+                output_message += line + "\n"
+            if output_message.strip():
+                await ctx.send(output_message, delete_after=60)
+            return
+        
+        elif subcommand == "trace":
+            # Stage-level tracing of command execution, exported as Chrome trace JSON
+            action = parts[1].lower() if len(parts) > 1 else "status"
+            if action == "on":
+                ccr_tracer.enabled = True
+                await ctx.send("🟢 Tracing enabled. Use `[p]ccr trace dump` to export.", delete_after=10)
+            elif action == "off":
+                ccr_tracer.enabled = False
+                await ctx.send(f"🔴 Tracing disabled ({len(ccr_tracer.events)} spans kept).", delete_after=10)
+            elif action == "clear":
+                ccr_tracer.clear()
+                await ctx.send("✅ Trace buffer cleared.", delete_after=10)
+            elif action == "dump":
+                if not ccr_tracer.events:
+                    await ctx.send("📋 No spans recorded yet.", delete_after=10)
+                    return
+                trace_file = Path(CCR_LOG_FILE).with_name(f"ccr_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+                await ccr_save_json_data(trace_file, ccr_tracer.export())
+                await ctx.send(f"✅ Wrote {len(ccr_tracer.events)} spans to `{trace_file}` (open in chrome://tracing or ui.perfetto.dev).", delete_after=20)
+            else:
+                status = "on" if ccr_tracer.enabled else "off"
+                await ctx.send(f"Tracing is {status} ({len(ccr_tracer.events)} spans buffered). Usage: `[p]ccr trace <on|off|dump|clear>`", delete_after=10)
+            return
+
+        elif subcommand == "dryrun":
+            # Simulate the current schedule on a virtual clock without sending anything
+            duration_label = parts[1].lower() if len(parts) > 1 else "1d"
+            duration = ccr_parse_time_to_seconds(duration_label)
+            if not duration or duration > CCR_DRYRUN_MAX_SECONDS:
+                await ctx.send("❌ Invalid duration (max 30d). Usage: `[p]ccr dryrun <duration>` e.g. `12h`, `1d`, `1w`", delete_after=10)
+                return
+            if not manager.channels_cfg.get("channels"):
+                await ctx.send("📋 No channels configured.", delete_after=10)
+                return
+
+            dry_run = CcrDryRunManager(manager)
+            start_time = dry_run.clock.time()
+            wall_start = time.perf_counter()
+            timeline = await dry_run.ccr_dry_run(duration)
+            wall_time = time.perf_counter() - wall_start
+
+            timeline_file = Path(CCR_LOG_FILE).with_name(f"ccr_dryrun_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            await ccr_save_json_data(timeline_file, {
+                "start": start_time,
+                "duration": duration,
+                "peak_concurrency": dry_run.peak_concurrency,
+                "timeline": [{"time": datetime.fromtimestamp(started).isoformat(timespec="seconds"), "channel_id": channel_id,
+                              "command": cmd_name, "lateness": round(lateness, 3)} for started, channel_id, cmd_name, lateness in timeline]
+            })
+
+            hours = duration / 3600
+            max_concurrency = dry_run.state.get("max_concurrency", 3)
+            peak_info = f" at {datetime.fromtimestamp(dry_run.peak_concurrency_at).strftime('%m-%d %H:%M:%S')}" if dry_run.peak_concurrency_at else ""
+            output_lines = [
+                f"**Dry Run**: {duration_label} simulated in {wall_time:.2f}s — {len(timeline)} executions",
+                f"Peak concurrency: {dry_run.peak_concurrency}/{max_concurrency}{peak_info}",
+                "", "**Per-channel load**:"
+            ]
+            channel_lateness = {}
+            for _, channel_id, _, lateness in timeline:
+                channel_lateness.setdefault(channel_id, []).append(lateness)
+            for channel_id, lateness in sorted(channel_lateness.items(), key=lambda item: -len(item[1])):
+                lateness.sort()
+                busy = dry_run.channel_busy.get(channel_id, 0.0) / duration * 100
+                output_lines.append(f"- <#{channel_id}>: {len(lateness)} runs ({len(lateness) / hours:.1f}/h) | busy {busy:.1f}% "
+                                    f"| late avg {ccr_format_seconds(sum(lateness) / len(lateness))} "
+                                    f"p95 {ccr_format_seconds(lateness[min(len(lateness) - 1, int(len(lateness) * 0.95))])} max {ccr_format_seconds(lateness[-1])}")
+            output_lines += ["", f"**Timeline** (first 15, full timeline in `{timeline_file}`):"]
+            for started, channel_id, cmd_name, lateness in timeline[:15]:
+                output_lines.append(f"- `{datetime.fromtimestamp(started).strftime('%m-%d %H:%M:%S')}` <#{channel_id}> `{cmd_name}` (late {ccr_format_seconds(lateness)})")
+
+            output_message = ""
+            for line in output_lines:
+                if len(output_message) + len(line) > 1900:
+                    await ctx.send(output_message, delete_after=60)
+                    output_message = ""
+                output_message += line + "\n"
+            if output_message.strip():
+                await ctx.send(output_message, delete_after=60)
+            return
+
+        elif subcommand == "api":
+            # Base URL for every Discord API call, so the runner can be pointed at a local stub server
+            if len(parts) < 2:
+                await ctx.send(f"Discord API base URL: `{manager.state.get('api_base_url') or CCR_DISCORD_API_BASE}`", delete_after=10)
+                return
+            
+            new_base = parts[1].strip()
+            if new_base.lower() in ("reset", "default"):
+                new_base = None
+            elif not re.match(r'^https?://', new_base):
+                await ctx.send("❌ Invalid URL. Usage: `[p]ccr api <http(s)://host[:port]/api|reset>`", delete_after=10)
+                return
+            elif not ccr_api_base_allowed(new_base):
+                await ctx.send("❌ Refused: every API call sends your token to this URL. Use https, or http only for localhost / 127.0.0.1 / ::1.", delete_after=10)
+                return
+            
+            async with manager.state_lock:
+                manager.state["api_base_url"] = new_base.rstrip("/") if new_base else None
+            await manager.ccr_save_state()
+            manager.slash_definitions.clear()
+            await ctx.send(f"✅ Discord API base URL set to `{manager.state['api_base_url'] or CCR_DISCORD_API_BASE}`.", delete_after=10)
+            return
+        
+        elif subcommand == "concurrency":
+            # Show or change how many channels may execute at once
+            if len(parts) < 2:
+                await ctx.send(f"Max concurrent channels: `{manager.state.get('max_concurrency', 3)}` ({len(manager.inflight_jobs)} running now).", delete_after=10)
+                return
+            
+            new_limit = ccr_safe_int(parts[1], 0)
+            if new_limit < 1:
+                await ctx.send("❌ Invalid value. Usage: `[p]ccr concurrency <number>`", delete_after=10)
+                return
+            
+            new_limit = manager.ccr_set_max_concurrency(new_limit)
+            await manager.ccr_save_state()
+            await ctx.send(f"✅ Max concurrent channels set to {new_limit}.", delete_after=10)
+            return
+        
         elif subcommand == "edit":
             # Interactive command editor
             if len(parts) < 2:
@@ -2814,7 +4049,7 @@ def custom_command_runner_script():
                     return
                 
                 if len(parts) < 4:
-                    await ctx.send("❌ Missing action. Use: toggle, cooldown, args, or delete.", delete_after=10)
+                    await ctx.send("❌ Missing action. Use: toggle, cooldown, args, refresh, or delete.", delete_after=10)
                     return
                 
                 action = parts[3].lower()
@@ -2833,12 +4068,28 @@ def custom_command_runner_script():
                         target_cmd["execution_type"] = preserved_execution_type
                     
                     new_status = "enabled" if target_cmd["enabled"] else "disabled"
+                    if target_cmd["enabled"]:
+                        manager.ccr_forget_missing_command(target_cmd)
                     await manager.ccr_save_channels()
-                    manager.ccr_trigger_reschedule()
+                    manager.ccr_trigger_reschedule(target_channel_id, target_cmd)
                     await manager.ccr_connect_and_populate_ui()
                     await ctx.send(f"✅ Command `{cmd_name}` has been {new_status}.", delete_after=10)
                     return
                 
+                elif action == "refresh":
+                    # Drop cached lookup results (found and not found) so the next run searches again
+                    if target_cmd.get("command_type") != "slash":
+                        await ctx.send(f"❌ Command `{cmd_name}` is not a slash command.", delete_after=10)
+                        return
+                    forgotten = manager.ccr_forget_missing_command(target_cmd)
+                    channel_obj = bot.get_channel(target_channel_id)
+                    refreshed = manager.slash_definitions.invalidate(target_cmd.get("bot_id"), ccr_channel_guild_id(channel_obj) if channel_obj else None, (cmd_name.split() or [""])[0])
+                    if forgotten or refreshed:
+                        await ctx.send(f"✅ Cached lookups for `{cmd_name}` cleared; the next run searches again.", delete_after=10)
+                    else:
+                        await ctx.send(f"📋 Nothing cached for `{cmd_name}`.", delete_after=10)
+                    return
+                
                 elif action == "cooldown":
                     # Change command cooldown
                     if len(parts) < 5:
@@ -2874,9 +4125,9 @@ def custom_command_runner_script():
                             last_used[cmd_key] = time.time() - new_cooldown
                             manager.state["last_used"] = last_used
                             await manager.ccr_save_state()
-                            manager.ccr_trigger_reschedule()
                     
                     await manager.ccr_save_channels()
+                    manager.ccr_trigger_reschedule(target_channel_id, target_cmd)
                     await manager.ccr_connect_and_populate_ui()
                     await ctx.send(f"✅ Command `{cmd_name}` cooldown changed to {new_cooldown} seconds.", delete_after=10)
                     return
@@ -2920,6 +4171,7 @@ def custom_command_runner_script():
                     if 0 <= cmd_index < len(commands):
                         commands.pop(cmd_index)
                         await manager.ccr_save_channels()
+                        manager.ccr_trigger_reschedule()
                         await manager.ccr_connect_and_populate_ui()
                         await ctx.send(f"✅ Command `{cmd_name}` has been deleted.", delete_after=10)
                     else:
@@ -2978,7 +4230,7 @@ def custom_command_runner_script():
                         if preserved_execution_type:
                             target_cmd["execution_type"] = preserved_execution_type
                         await manager.ccr_save_channels()
-                        manager.ccr_trigger_reschedule()
+                        manager.ccr_trigger_reschedule(target_channel_id, target_cmd)
                         await manager.ccr_connect_and_populate_ui()
                         await ctx.send(f"✅ Timer cleared for command `{cmd_name}`.", delete_after=10)
                         return
@@ -3004,7 +4256,7 @@ def custom_command_runner_script():
                         
                         status = "enabled" if timer["enabled"] else "disabled"
                         await manager.ccr_save_channels()
-                        manager.ccr_trigger_reschedule()
+                        manager.ccr_trigger_reschedule(target_channel_id, target_cmd)
                         await manager.ccr_connect_and_populate_ui()
                         await ctx.send(f"✅ Timer {status} for command `{cmd_name}`.", delete_after=10)
                         return
@@ -3048,7 +4300,7 @@ def custom_command_runner_script():
                             target_cmd["execution_type"] = preserved_execution_type
                         
                         await manager.ccr_save_channels()
-                        manager.ccr_trigger_reschedule()
+                        manager.ccr_trigger_reschedule(target_channel_id, target_cmd)
                         await manager.ccr_connect_and_populate_ui()
                         
                         days_str = f" on {', '.join(days)}" if days else " (all days)"
@@ -3060,7 +4312,7 @@ def custom_command_runner_script():
                         return
                 
                 else:
-                    await ctx.send("❌ Invalid action. Use: toggle, cooldown, args, delete, type, or timer.", delete_after=10)
+                    await ctx.send("❌ Invalid action. Use: toggle, cooldown, args, refresh, delete, type, or timer.", delete_after=10)
                     return
             
             # Display commands with numbers for selection
@@ -3091,6 +4343,7 @@ def custom_command_runner_script():
             cmd_list += "• `[p]ccr edit {0} <num> timer set <start> <end> [days...]` - Set timer\n".format(target_channel_id)
             cmd_list += "• `[p]ccr edit {0} <num> timer toggle` - Enable/disable timer\n".format(target_channel_id)
             cmd_list += "• `[p]ccr edit {0} <num> timer clear` - Remove timer\n".format(target_channel_id)
+            cmd_list += "• `[p]ccr edit {0} <num> refresh` - Forget cached slash lookups, including \"not found\"\n".format(target_channel_id)
             cmd_list += "• `[p]ccr edit {0} <num> delete` - Delete command\n".format(target_channel_id)
             
             await ctx.send(cmd_list, delete_after=120)
@@ -3104,7 +4357,13 @@ def custom_command_runner_script():
                 "- `[p]ccr stop` - Stops the command runner process.\n"
                 "- `[p]ccr list` - Displays detailed status and command information.\n"
                 "- `[p]ccr edit <channel_id>` - Interactive command editor for a specific channel.\n"
+                "- `[p]ccr edit <channel_id> <num> refresh` - Forget cached lookups (including \"not found\") for a slash command.\n"
                 "- `[p]ccr debug` - Toggle debug mode for detailed logging.\n"
+                "- `[p]ccr concurrency [number]` - Show or set how many channels run commands at once.\n"
+                "- `[p]ccr stats [reset]` - Response latency percentiles, timeout rate and lateness per command and bot.\n"
+                "- `[p]ccr trace <on|off|dump|clear>` - Record execution stage spans and export them as a Chrome trace.\n"
+                "- `[p]ccr api [url|reset]` - Show or change the Discord API base URL (e.g. a local stub server for testing; https, or http on localhost only).\n"
+                "- `[p]ccr dryrun [duration]` - Simulate the schedule (default 1d) on a virtual clock: timeline, per-channel load and peak concurrency.\n"
                 "- `[p]ccr help` - Shows this help message.\n\n"
 
                 "--- **Usage** ---\n"
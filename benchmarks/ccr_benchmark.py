@@ -0,0 +1,476 @@
+"""Offline benchmark for the Command Runner scheduler in Scripts/autoslash.py.
+
+The script is executed the way Nighty would run it, but against stand-ins for the
+Nighty globals (bot, getScriptsPath, fetchSlashCommand, Tab, UI, nightyScript) and a
+stub `discord` module. Fake channels and slash commands answer after a configurable
+latency, so the real scheduler loop, lanes, ccr_execute_command and the on_message
+dispatcher are exercised without a Discord account.
+
+Two phases run for every configured size:
+  * schedule   - builds the command index and heap, then times repeated picks
+                 (peek + re-schedule) and measures memory per command.
+  * run        - starts the manager for --duration seconds and reports throughput,
+                 response latency, scheduler overhead per pick and memory growth.
+
+Usage:
+    python benchmarks/ccr_benchmark.py --sizes 100 1000 10000 --duration 10
+
+The runner's Discord API base URL points at benchmarks/discord_stub_server.py, started
+in-process on a local port; the fake bots answer every interaction it accepts. Slash
+lookups race fetchSlashCommand against the stub's global command list. With
+--stub-server fetchSlashCommand always misses, so every slash command goes through the
+global list and HTTP interactions. --stub-args passes failure injection options through,
+e.g. --stub-args "--interaction-limit 5/1 --error-rate 0.05".
+
+aiohttp must be installed (the script imports it); nothing leaves the machine.
+This directory lives outside Scripts/ so Nighty never loads it as a script.
+"""
+import argparse
+import asyncio
+import gc
+import itertools
+import random
+import shlex
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / "Scripts" / "autoslash.py"
+BOT_USER_ID = 100000000000000001
+FIRST_CHANNEL_ID = 200000000000000000
+FIRST_BOT_ID = 300000000000000000
+GUILD_ID = 400000000000000000
+
+real_sleep = asyncio.sleep
+snowflakes = itertools.count(500000000000000000)
+
+
+class Anything:
+    """Accepts any attribute access or call; stands in for Nighty's Tab/UI objects"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return Anything()
+
+    def __call__(self, *args, **kwargs):
+        return Anything()
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+
+def install_discord_stub():
+    """Only Embed is imported by the script"""
+    discord = types.ModuleType("discord")
+
+    class Embed:
+        def __init__(self, title=None, description=None, color=None):
+            self.data = {"title": title, "description": description, "color": color}
+
+        def set_footer(self, text=None):
+            self.data["footer"] = {"text": text}
+
+        def to_dict(self):
+            return dict(self.data)
+
+    discord.Embed = Embed
+    sys.modules.setdefault("discord", discord)
+
+
+class LatencyModel:
+    def __init__(self, send_ms, response_ms, timeout_rate):
+        self.send = send_ms / 1000
+        self.response = response_ms / 1000
+        self.timeout_rate = timeout_rate
+
+    def send_delay(self):
+        return self.send
+
+    def response_delay(self):
+        # Exponential tail around the configured mean, like a real bot under load
+        return random.expovariate(1 / self.response) if self.response > 0 else 0
+
+    def answers(self):
+        return random.random() >= self.timeout_rate
+
+
+class FakeTyping:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeChannel:
+    def __init__(self, harness, channel_id, prefix_bot_id):
+        self.harness = harness
+        self.id = channel_id
+        self.name = f"bench-{channel_id - FIRST_CHANNEL_ID}"
+        self.guild = SimpleNamespace(id=GUILD_ID)
+        self.prefix_bot_id = prefix_bot_id
+
+    def typing(self):
+        return FakeTyping()
+
+    async def send(self, content):
+        self.harness.sent += 1
+        await real_sleep(self.harness.latency.send_delay())
+        if self.harness.latency.answers():
+            self.harness.reply_later(self, self.prefix_bot_id, content=f"reply to {content}")
+
+
+class FakeSlashCommand:
+    def __init__(self, harness, bot_id, name):
+        self.harness = harness
+        self.id = next(snowflakes)
+        self.version = "1"
+        self.name = name
+        self.bot_id = bot_id
+        self.options = []
+
+    async def __call__(self, channel, **kwargs):
+        self.harness.sent += 1
+        await real_sleep(self.harness.latency.send_delay())
+        interaction = SimpleNamespace(id=next(snowflakes), nonce=str(next(snowflakes)), name=self.name)
+        self.harness.bot.dispatch("interaction", interaction)
+        if self.harness.latency.answers():
+            message_interaction = SimpleNamespace(id=interaction.id, name=self.name, user=self.harness.bot.user)
+            self.harness.reply_later(channel, self.bot_id, interaction=message_interaction)
+        return interaction
+
+
+class FakeBot:
+    def __init__(self, loop):
+        self.loop = loop
+        self.user = SimpleNamespace(id=BOT_USER_ID, bot=False)
+        self.http = SimpleNamespace(token="benchmark-token")
+        self.channels = {}
+        self.listeners = defaultdict(list)
+
+    def listen(self, event):
+        def decorator(func):
+            self.listeners[event].append(func)
+            return func
+        return decorator
+
+    def command(self, *args, **kwargs):
+        return lambda func: func
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def dispatch(self, event, *args):
+        for listener in self.listeners.get(f"on_{event}", ()):
+            self.loop.create_task(listener(*args))
+
+
+class Harness:
+    def __init__(self, args, scripts_dir):
+        self.args = args
+        self.scripts_dir = scripts_dir
+        self.latency = LatencyModel(args.send_latency, args.response_latency, args.timeout_rate)
+        self.loop = asyncio.get_event_loop()
+        self.bot = FakeBot(self.loop)
+        self.sent = 0
+        self.replies = 0
+        self.fetches = 0
+        self.slash_commands = {}
+        self.manager_class = None
+        self.default_state = None
+        self.api_base_url = None
+
+    # --- Nighty globals ---
+    async def fetch_slash_command(self, channel, bot_id, name):
+        self.fetches += 1
+        await real_sleep(self.latency.send_delay())
+        if self.args.stub_server:
+            # Leave the lookup to the stub server's global command list
+            return None
+        key = (int(bot_id), name)
+        if key not in self.slash_commands:
+            self.slash_commands[key] = FakeSlashCommand(self, int(bot_id), name)
+        return self.slash_commands[key]
+
+    def reply_later(self, channel, author_id, content="", interaction=None):
+        async def reply():
+            await real_sleep(self.latency.response_delay())
+            self.replies += 1
+            message = SimpleNamespace(
+                id=next(snowflakes), channel=channel, content=content, embeds=[],
+                author=SimpleNamespace(id=author_id, bot=True),
+                interaction=interaction, interaction_metadata=None,
+                jump_url=f"https://discord.com/channels/{GUILD_ID}/{channel.id}/0"
+            )
+            self.bot.dispatch("message", message)
+        self.loop.create_task(reply())
+
+    def load_script(self):
+        """Execute autoslash.py with the stand-in globals and capture the manager class"""
+        install_discord_stub()
+        script_globals = {
+            "__name__": "ccr_benchmark_script",
+            "nightyScript": lambda **kwargs: (lambda func: func),
+            "bot": self.bot,
+            "getScriptsPath": lambda: str(self.scripts_dir),
+            "fetchSlashCommand": self.fetch_slash_command,
+            "Tab": Anything,
+            "UI": Anything(),
+        }
+        code = compile(SCRIPT_PATH.read_text(encoding="utf-8"), str(SCRIPT_PATH), "exec")
+        exec(code, script_globals)
+        # The script schedules its initializer on bot.loop; let it create the first manager
+        self.loop.run_until_complete(real_sleep(0.2))
+        manager = getattr(self.bot, "_command_runner_manager", None)
+        if manager is None:
+            raise RuntimeError("The script did not create a CommandRunnerManager")
+        self.manager_class = type(manager)
+        self.default_state = {key: value for key, value in manager.state.items() if key != "last_used"}
+
+    async def start_stub_server(self):
+        """Serve the Discord API stub on a free local port and route the runner's API calls to it"""
+        import discord_stub_server
+        from aiohttp import web
+        parser = discord_stub_server.build_parser()
+        options = parser.parse_args(["--latency", str(self.args.send_latency), "--jitter", "0",
+                                     "--commands", str(self.args.commands_per_channel)] + shlex.split(self.args.stub_args))
+        app = discord_stub_server.create_app(discord_stub_server.finalize_options(options), self.stub_interaction)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.api_base_url = f"http://127.0.0.1:{port}/api"
+        return runner
+
+    def stub_interaction(self, payload):
+        """The stub accepted an interaction: announce it and let the bot answer"""
+        self.sent += 1
+        channel = self.bot.get_channel(int(payload["channel_id"]))
+        interaction = SimpleNamespace(id=next(snowflakes), nonce=payload.get("nonce"), name=payload["data"]["name"])
+        self.bot.dispatch("interaction", interaction)
+        if channel and self.latency.answers():
+            message_interaction = SimpleNamespace(id=interaction.id, name=interaction.name, user=self.bot.user)
+            self.reply_later(channel, int(payload["application_id"]), interaction=message_interaction)
+
+    # --- Workload ---
+    def build_config(self, size):
+        per_channel = max(1, self.args.commands_per_channel)
+        channel_count = max(1, (size + per_channel - 1) // per_channel)
+        channels = {}
+        self.bot.channels = {}
+        created = 0
+        for channel_index in range(channel_count):
+            channel_id = FIRST_CHANNEL_ID + channel_index
+            prefix_bot_id = FIRST_BOT_ID + channel_index % self.args.bots
+            self.bot.channels[channel_id] = FakeChannel(self, channel_id, prefix_bot_id)
+            commands = []
+            for command_index in range(min(per_channel, size - created)):
+                is_slash = random.random() < self.args.slash_ratio
+                commands.append({
+                    "name": f"cmd{command_index}",
+                    "command_type": "slash" if is_slash else "prefix",
+                    "prefix": "!",
+                    "bot_id": str(FIRST_BOT_ID + (channel_index + command_index) % self.args.bots if is_slash else prefix_bot_id),
+                    "cooldown": self.args.cooldown * random.uniform(1, 1.5),
+                    "enabled": True,
+                    "args": ""
+                })
+                created += 1
+            channels[str(channel_id)] = {
+                "commands": commands,
+                "humanization": {"typing": self.args.humanize, "human_delay": {"enabled": self.args.humanize, "min": 5, "max": 45}}
+            }
+        return {"channels": channels}
+
+    def new_manager(self, size):
+        manager = self.manager_class()
+        manager.state = dict(self.default_state, last_used={}, is_running=True, max_concurrency=self.args.concurrency,
+                             api_base_url=self.api_base_url)
+        manager.channels_cfg = self.build_config(size)
+        self.bot._command_runner_manager = manager
+        return manager
+
+    # --- Phases ---
+    def bench_schedule(self, size):
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        manager = self.new_manager(size)
+        started = time.perf_counter()
+        manager.ccr_rebuild_command_index()
+        manager.ccr_rebuild_schedule()
+        build_seconds = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+        picks = min(self.args.picks, max(size * 5, 1000))
+        started = time.perf_counter()
+        for _ in range(picks):
+            entry = manager.ccr_peek_schedule()
+            if entry is None:
+                break
+            # What the scheduler and the lane do for one job, minus the execution itself
+            del manager.schedule_entries[entry[2]]
+            manager.ccr_schedule_command(entry[3], entry[4], next_run_time=entry[0] + entry[4]["cooldown"])
+        pick_seconds = time.perf_counter() - started
+        return {
+            "build_ms": build_seconds * 1000,
+            "pick_us": pick_seconds / picks * 1e6,
+            "bytes_per_command": memory / max(size, 1),
+            "heap": len(manager.schedule_heap),
+        }
+
+    async def bench_run(self, size):
+        manager = self.new_manager(size)
+        manager.ccr_rebuild_command_index()
+        pick_times = []
+        original_peek = manager.ccr_peek_schedule
+
+        def timed_peek():
+            started = time.perf_counter()
+            try:
+                return original_peek()
+            finally:
+                pick_times.append(time.perf_counter() - started)
+        manager.ccr_peek_schedule = timed_peek
+
+        noise_task = self.loop.create_task(self.noise()) if self.args.noise_rate else None
+        self.sent = self.replies = 0
+        gc.collect()
+        tracemalloc.start()
+        memory_start = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        await manager.ccr_start()
+        await real_sleep(self.args.duration)
+        await manager.ccr_stop()
+        elapsed = time.perf_counter() - started
+        gc.collect()
+        memory_growth = tracemalloc.get_traced_memory()[0] - memory_start
+        tracemalloc.stop()
+        if noise_task:
+            noise_task.cancel()
+
+        responses = sum(stats.responses for stats in manager.command_stats.values())
+        timeouts = sum(stats.timeouts for stats in manager.command_stats.values())
+        latency = self.merge_histograms(stats.latency for stats in manager.bot_stats.values())
+        lateness = self.merge_histograms(stats.lateness for stats in manager.command_stats.values())
+        await manager.ccr_shutdown()
+        return {
+            "executions": self.sent,
+            "throughput": responses / elapsed,
+            "responses": responses,
+            "timeouts": timeouts,
+            "latency_p50": latency.percentile(50),
+            "latency_p95": latency.percentile(95),
+            "lateness_p95": lateness.percentile(95),
+            "pick_us": statistics.mean(pick_times) * 1e6 if pick_times else 0.0,
+            "memory_growth": memory_growth,
+        }
+
+    @staticmethod
+    def merge_histograms(histograms):
+        merged = None
+        for histogram in histograms:
+            if merged is None:
+                merged = type(histogram)()
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.count += histogram.count
+            merged.max = max(merged.max, histogram.max)
+        return merged or SimpleNamespace(percentile=lambda pct: None)
+
+    async def noise(self):
+        """Unrelated bot traffic in unwatched channels, to load the on_message pre-filter"""
+        interval = 1 / self.args.noise_rate
+        while True:
+            channel = SimpleNamespace(id=FIRST_CHANNEL_ID - 1 - random.randrange(1000))
+            self.bot.dispatch("message", SimpleNamespace(
+                id=next(snowflakes), channel=channel, content="noise", embeds=[],
+                author=SimpleNamespace(id=FIRST_BOT_ID, bot=True), interaction=None, interaction_metadata=None))
+            await real_sleep(interval)
+
+
+def scaled_sleep_factory(scale):
+    """Humanization pauses and lane rests are compressed; simulated network latency is not"""
+    async def scaled_sleep(delay, result=None):
+        return await real_sleep(delay * scale, result)
+    return scaled_sleep
+
+
+def format_bytes(value):
+    return f"{value / 1024:.1f} KiB" if abs(value) >= 1024 else f"{value:.0f} B"
+
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    return f"{value * 1000:.0f}ms" if value < 1 else f"{value:.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="number of configured commands")
+    parser.add_argument("--commands-per-channel", type=int, default=10)
+    parser.add_argument("--bots", type=int, default=5, help="distinct target bots")
+    parser.add_argument("--slash-ratio", type=float, default=0.7, help="share of slash commands (rest are prefix)")
+    parser.add_argument("--cooldown", type=float, default=2.0, help="base cooldown in seconds")
+    parser.add_argument("--send-latency", type=float, default=40, help="ms per send / interaction call")
+    parser.add_argument("--response-latency", type=float, default=250, help="mean ms until the bot answers")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of commands that never get an answer")
+    parser.add_argument("--concurrency", type=int, default=3, help="max_concurrency for the run phase")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per run phase (0 skips it)")
+    parser.add_argument("--picks", type=int, default=50000, help="picks timed in the schedule phase")
+    parser.add_argument("--noise-rate", type=float, default=200, help="unrelated messages per second during the run")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="factor applied to the script's asyncio.sleep calls")
+    parser.add_argument("--humanize", action="store_true", help="keep typing and human delay enabled")
+    parser.add_argument("--stub-server", action="store_true", help="resolve every slash command through the stub server (fetchSlashCommand misses)")
+    parser.add_argument("--stub-args", default="", help="extra discord_stub_server.py options, as one string")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    with tempfile.TemporaryDirectory(prefix="ccr-bench-") as scripts_dir:
+        harness = Harness(args, Path(scripts_dir))
+        harness.load_script()
+        stub_runner = loop.run_until_complete(harness.start_stub_server())
+        asyncio.sleep = scaled_sleep_factory(args.time_scale)
+        try:
+            print(f"{'commands':>9} | {'build':>9} | {'pick':>8} | {'mem/cmd':>9} || {'thrpt/s':>8} | {'p50':>7} | {'p95':>7} | {'late p95':>8} | {'run pick':>8} | {'timeouts':>8} | {'mem growth':>10}")
+            for size in args.sizes:
+                schedule = harness.bench_schedule(size)
+                line = (f"{size:>9} | {schedule['build_ms']:>7.1f}ms | {schedule['pick_us']:>6.1f}us | "
+                        f"{format_bytes(schedule['bytes_per_command']):>9} ||")
+                if args.duration > 0:
+                    run = loop.run_until_complete(harness.bench_run(size))
+                    line += (f" {run['throughput']:>8.1f} | {format_seconds(run['latency_p50']):>7} | {format_seconds(run['latency_p95']):>7} | "
+                             f"{format_seconds(run['lateness_p95']):>8} | {run['pick_us']:>6.1f}us | {run['timeouts']:>8} | {format_bytes(run['memory_growth']):>10}")
+                print(line, flush=True)
+        finally:
+            asyncio.sleep = real_sleep
+            loop.run_until_complete(stub_runner.cleanup())
+            sink = getattr(harness.bot, "_ccr_log_sink", None)
+            if sink:
+                sink.stop()
+            # Replies still in flight when the last run stopped
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+
+if __name__ == "__main__":
+    main()
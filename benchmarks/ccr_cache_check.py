@@ -0,0 +1,129 @@
+"""Round-trip check for the persistent slash definition cache (json/ccr_slash_cache.json).
+
+A definition whose option types are discord-style enums is cached, written to disk by
+the manager, loaded into a fresh manager and then executed against the in-process
+Discord stub server. The interaction payload the stub receives must carry int option
+types and the expected subcommand / argument tree.
+
+Usage:
+    python benchmarks/ccr_cache_check.py
+
+Exits non-zero on failure. Needs aiohttp, like ccr_benchmark.py.
+"""
+import asyncio
+import json
+import sys
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+from types import SimpleNamespace
+
+from ccr_benchmark import FIRST_BOT_ID, FIRST_CHANNEL_ID, GUILD_ID, FakeChannel, Harness
+
+# discord.py enum members are namedtuple-backed, so json.dump writes them as [name, value]
+EnumValue = namedtuple("EnumValue", "name value")
+SUB_COMMAND, STRING, INTEGER = EnumValue("sub_command", 1), EnumValue("string", 3), EnumValue("integer", 4)
+
+BOT_ID = FIRST_BOT_ID
+CHANNEL_ID = FIRST_CHANNEL_ID
+EXPECTED_OPTIONS = [{"type": 1, "name": "give", "options": [
+    {"type": 4, "name": "amount", "value": 5},
+    {"type": 3, "name": "note", "value": "hi"},
+]}]
+
+
+def enum_definition():
+    option = lambda name, type_, options=(): SimpleNamespace(name=name, type=type_, description="", required=False, options=list(options), choices=None)
+    return SimpleNamespace(id="600000000000000001", version="600000000000000002", name="cmd0", type=1, options=[
+        option("give", SUB_COMMAND, [option("amount", INTEGER), option("note", STRING)])
+    ])
+
+
+def command_config():
+    return {"channels": {str(CHANNEL_ID): {
+        "humanization": {"typing": False, "human_delay": {"enabled": False}},
+        "commands": [{"name": "cmd0 give", "args": "amount=5 note=hi", "command_type": "slash", "bot_id": str(BOT_ID),
+                      "cooldown": 600, "enabled": True, "timer": {"enabled": False}}]
+    }}}
+
+
+class CacheCheck:
+    def __init__(self, scripts_dir):
+        args = SimpleNamespace(send_latency=5, response_latency=20, timeout_rate=0.0, commands_per_channel=1,
+                               stub_server=True, stub_args="--commands 0")
+        self.harness = Harness(args, scripts_dir)
+        self.payloads = []
+        forward = self.harness.stub_interaction
+
+        def capture(payload):
+            self.payloads.append(payload)
+            forward(payload)
+        self.harness.stub_interaction = capture
+        self.harness.load_script()
+        self.harness.bot.channels = {CHANNEL_ID: FakeChannel(self.harness, CHANNEL_ID, BOT_ID)}
+        self.cache_file = scripts_dir / "json" / "ccr_slash_cache.json"
+
+    def new_manager(self):
+        manager = self.harness.manager_class()
+        manager.state = dict(self.harness.default_state, last_used={}, api_base_url=self.harness.api_base_url)
+        manager.channels_cfg = command_config()
+        manager.ccr_rebuild_command_index()
+        self.harness.bot._command_runner_manager = manager
+        return manager
+
+    async def execute_from_disk(self):
+        """Load the cache file into a fresh manager, run the command and return the payload the stub got"""
+        manager = self.new_manager()
+        loaded = manager.slash_definitions.load(json.loads(self.cache_file.read_text(encoding="utf-8")))
+        assert loaded == 1, f"expected 1 definition loaded, got {loaded}"
+        channel_config = manager.channels_cfg["channels"][str(CHANNEL_ID)]
+        self.payloads.clear()
+        await manager.ccr_execute_command(self.harness.bot.get_channel(CHANNEL_ID), channel_config, channel_config["commands"][0])
+        await manager.ccr_shutdown()
+        assert len(self.payloads) == 1, f"expected 1 interaction, got {len(self.payloads)}"
+        return self.payloads[0]
+
+    @staticmethod
+    def check_payload(payload, label):
+        data = payload["data"]
+        assert data["name"] == "cmd0" and data["type"] == 1, f"{label}: unexpected command {data}"
+        assert data["options"] == EXPECTED_OPTIONS, f"{label}: unexpected options {data['options']}"
+        print(f"ok  {label}")
+
+    async def run(self):
+        await self.harness.start_stub_server()
+
+        # Resolved definition with enum types -> cache file written by the manager
+        manager = self.new_manager()
+        manager.slash_definitions.put(BOT_ID, GUILD_ID, "cmd0", enum_definition(), "global")
+        await manager.ccr_shutdown()
+        stored = json.loads(self.cache_file.read_text(encoding="utf-8"))["definitions"][0][8]
+        assert stored[0]["type"] == 1 and stored[0]["options"][0]["type"] == 4, f"types not stored as ints: {stored}"
+        print("ok  option types exported as ints")
+        self.check_payload(await self.execute_from_disk(), "payload from round-tripped definition")
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    with tempfile.TemporaryDirectory(prefix="ccr-cache-check-") as scripts_dir:
+        check = CacheCheck(Path(scripts_dir))
+        try:
+            loop.run_until_complete(check.run())
+        except AssertionError as e:
+            print(f"FAIL {e}")
+            return 1
+        finally:
+            sink = getattr(check.harness.bot, "_ccr_log_sink", None)
+            if sink:
+                sink.stop()
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Scheduler checks for Scripts/autoslash.py, run against the benchmark harness.
+
+  * save during a run - the command dicts are replaced (as a UI save does) while the
+                        command is executing; it must stay scheduled and run again.
+  * saturated cap     - far more commands fall due than max_concurrency=1 can send; the
+                        time spent waiting for a slot must show up as lateness.
+
+Usage:
+    python benchmarks/ccr_schedule_check.py
+
+Exits non-zero on failure. Needs aiohttp, like ccr_benchmark.py. Humanization pauses
+and lane rests are compressed like in the benchmark; responses are not.
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from ccr_benchmark import Harness, LatencyModel, real_sleep, scaled_sleep_factory
+
+TIME_SCALE = 0.01
+
+
+def harness_args(**overrides):
+    args = dict(send_latency=5, response_latency=300, timeout_rate=0.0, commands_per_channel=1, bots=1,
+                slash_ratio=0.0, cooldown=1.0, humanize=False, concurrency=3, stub_server=False, stub_args="")
+    args.update(overrides)
+    return SimpleNamespace(**args)
+
+
+async def wait_until(predicate, timeout):
+    for _ in range(int(timeout / 0.005)):
+        if predicate():
+            return True
+        await real_sleep(0.005)
+    return predicate()
+
+
+class ScheduleCheck:
+    def __init__(self, scripts_dir):
+        self.harness = Harness(harness_args(), scripts_dir)
+        self.harness.load_script()
+
+    def configure(self, **overrides):
+        """Switch the harness to a new workload and return it"""
+        harness = self.harness
+        harness.args = harness_args(**overrides)
+        harness.latency = LatencyModel(harness.args.send_latency, harness.args.response_latency, harness.args.timeout_rate)
+        harness.sent = harness.replies = 0
+        return harness
+
+    async def check_save_during_run(self):
+        harness = self.configure()
+        manager = harness.new_manager(1)
+        manager.ccr_rebuild_command_index()
+        await manager.ccr_start()
+        try:
+            assert await wait_until(lambda: harness.sent == 1 and manager.inflight_jobs, 5), "the command never started"
+            # What on_ccr_save_changes does: every command dict is replaced by an edited copy
+            for channel_config in manager.channels_cfg["channels"].values():
+                channel_config["commands"] = [dict(cmd) for cmd in channel_config["commands"]]
+            manager.ccr_trigger_reschedule()
+            assert await wait_until(lambda: harness.sent >= 2, 10), \
+                f"command dropped from the schedule after a save during its run (sent {harness.sent}, scheduled {len(manager.schedule_entries)})"
+        finally:
+            await manager.ccr_stop()
+            await manager.ccr_shutdown()
+        print("ok  command saved during its run stays scheduled")
+
+    async def check_saturated_cap(self):
+        harness = self.configure(commands_per_channel=1, cooldown=1.0, response_latency=500, concurrency=1)
+        manager = harness.new_manager(20)
+        manager.ccr_rebuild_command_index()
+        await manager.ccr_start()
+        await real_sleep(5)
+        await manager.ccr_stop()
+        lateness = max((stats.lateness.max for stats in manager.command_stats.values()), default=0.0)
+        await manager.ccr_shutdown()
+        # 20 commands due every ~1s against roughly two sends a second: the last ones in line wait for seconds
+        assert lateness > 2, f"max lateness {lateness:.2f}s after {harness.sent} sends does not show the concurrency cap"
+        print(f"ok  waiting for a concurrency slot counts as lateness (max {lateness:.1f}s over {harness.sent} sends)")
+
+    async def run(self):
+        asyncio.sleep = scaled_sleep_factory(TIME_SCALE)
+        try:
+            await self.check_save_during_run()
+            await self.check_saturated_cap()
+        finally:
+            asyncio.sleep = real_sleep
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    with tempfile.TemporaryDirectory(prefix="ccr-schedule-check-") as scripts_dir:
+        check = ScheduleCheck(Path(scripts_dir))
+        try:
+            loop.run_until_complete(check.run())
+        except AssertionError as e:
+            print(f"FAIL {e}")
+            return 1
+        finally:
+            sink = getattr(check.harness.bot, "_ccr_log_sink", None)
+            if sink:
+                sink.stop()
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
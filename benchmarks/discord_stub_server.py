@@ -0,0 +1,252 @@
+"""Local stand-in for the Discord HTTP endpoints the Command Runner talks to.
+
+Implements the subset of the API used by Scripts/autoslash.py:
+  * GET  /api[/vN]/applications/{application_id}/commands   - global command list
+  * POST /api[/vN]/interactions                             - slash command interactions
+  * POST /api[/vN]/webhooks/{webhook_id}/{token}            - log webhook sends
+plus two control endpoints for benchmarks:
+  * GET  /_stub/stats  - request counts per route and status
+  * POST /_stub/reset  - clear the counters and rate limit buckets
+
+Failure injection (all optional): response latency with jitter, per-route rate limit
+buckets answering 429 with Retry-After and X-RateLimit-* headers, periodic 5xx bursts,
+random 500s and 400 / 10005 "Unknown Integration" for chosen or random bots.
+
+Usage:
+    python benchmarks/discord_stub_server.py --port 8765 --latency 80 --jitter 40 \\
+        --interaction-limit 5/1 --burst-every 60 --burst-duration 5 --unknown-bots 3000
+
+then point the runner at it with `[p]ccr api http://127.0.0.1:8765/api`
+(`[p]ccr api reset` switches back to discord.com). Guild command lookups go through
+Nighty's fetchSlashCommand and are not served here.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+DISCORD_EPOCH_MS = 1420070400000
+API_PREFIX = r"/api{version:(/v\d+)?}"
+# Bound at import so a benchmark that rescales asyncio.sleep after loading us keeps real latencies
+sleep = asyncio.sleep
+
+
+def snowflake_factory():
+    counter = itertools.count()
+
+    def new_snowflake():
+        return str(((int(time.time() * 1000) - DISCORD_EPOCH_MS) << 22) | (next(counter) & 0x3FFFFF))
+    return new_snowflake
+
+
+def parse_limit(value):
+    """'5/1' -> (5 requests, 1.0 second window); '0' disables the bucket"""
+    if not value or value == "0":
+        return None
+    count, _, window = value.partition("/")
+    return int(count), float(window or 1)
+
+
+class RateLimitBucket:
+    """Fixed-window bucket reporting Discord's X-RateLimit-* headers"""
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def take(self, now):
+        """Return (allowed, headers)"""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+        reset_after = max(0.0, self.reset_at - now)
+        allowed = self.remaining > 0
+        if allowed:
+            self.remaining -= 1
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+        }
+        if not allowed:
+            headers["Retry-After"] = f"{reset_after:.3f}"
+        return allowed, headers
+
+
+class StubState:
+    def __init__(self, options, on_interaction=None):
+        self.options = options
+        self.on_interaction = on_interaction
+        self.started = time.monotonic()
+        self.limits = {
+            "commands": parse_limit(options.commands_limit),
+            "interactions": parse_limit(options.interaction_limit),
+            "webhooks": parse_limit(options.webhook_limit),
+        }
+        self.unknown_bots = set(options.unknown_bots or [])
+        self.new_snowflake = snowflake_factory()
+        self.command_ids = {}
+        self.reset()
+
+    def reset(self):
+        self.buckets = {}
+        self.stats = Counter()
+
+    def bucket(self, route, major):
+        limit = self.limits.get(route)
+        if limit is None:
+            return None
+        key = (route, major)
+        if key not in self.buckets:
+            self.buckets[key] = RateLimitBucket(*limit)
+        return self.buckets[key]
+
+    def in_burst(self, now):
+        every, duration = self.options.burst_every, self.options.burst_duration
+        return every > 0 and (now - self.started) % every < duration
+
+    def command_definition(self, application_id, name):
+        key = (application_id, name)
+        if key not in self.command_ids:
+            self.command_ids[key] = (self.new_snowflake(), self.new_snowflake())
+        command_id, version = self.command_ids[key]
+        return {"id": command_id, "application_id": application_id, "version": version, "name": name,
+                "description": f"Stub command {name}", "type": 1, "options": []}
+
+
+def error_response(status, message, code=0, headers=None):
+    return web.json_response({"message": message, "code": code}, status=status, headers=headers)
+
+
+async def guarded(request, route, major, handler):
+    """Latency, 5xx injection and rate limiting shared by every API route"""
+    state = request.app["stub"]
+    options = state.options
+    delay = options.latency + random.uniform(-options.jitter, options.jitter)
+    if delay > 0:
+        await sleep(delay / 1000)
+    now = time.monotonic()
+    if state.in_burst(now):
+        response = error_response(options.burst_status, "Service Unavailable")
+    elif options.error_rate and random.random() < options.error_rate:
+        response = error_response(500, "Internal Server Error")
+    else:
+        bucket = state.bucket(route, major)
+        allowed, headers = bucket.take(now) if bucket else (True, {})
+        if not allowed:
+            retry_after = float(headers["Retry-After"])
+            response = web.json_response({"message": "You are being rate limited.", "retry_after": retry_after, "global": False},
+                                         status=429, headers=headers)
+        else:
+            response = await handler()
+            response.headers.update(headers)
+    state.stats[f"{route} {response.status}"] += 1
+    return response
+
+
+async def get_application_commands(request):
+    application_id = request.match_info["application_id"]
+
+    async def handler():
+        if application_id in request.app["stub"].unknown_bots:
+            return error_response(404, "Unknown Application", 10002)
+        state = request.app["stub"]
+        return web.json_response([state.command_definition(application_id, name) for name in state.options.command_names])
+    return await guarded(request, "commands", application_id, handler)
+
+
+async def post_interaction(request):
+    try:
+        payload = json.loads(await request.text())
+    except ValueError:
+        return error_response(400, "400: Bad Request", 50109)
+
+    async def handler():
+        state = request.app["stub"]
+        if payload.get("type") != 2 or not isinstance(payload.get("data"), dict):
+            return error_response(400, "Invalid Form Body", 50035)
+        application_id = str(payload.get("application_id"))
+        if application_id in state.unknown_bots or (state.options.unknown_rate and random.random() < state.options.unknown_rate):
+            return error_response(400, "Unknown Integration", 10005)
+        if state.on_interaction:
+            state.on_interaction(payload)
+        return web.Response(status=204)
+    # Interactions share one bucket per user token, like the real endpoint
+    return await guarded(request, "interactions", request.headers.get("Authorization", ""), handler)
+
+
+async def post_webhook(request):
+    webhook_id = request.match_info["webhook_id"]
+    try:
+        payload = await request.json()
+    except ValueError:
+        return error_response(400, "400: Bad Request", 50109)
+
+    async def handler():
+        if len(payload.get("embeds") or []) > 10:
+            return error_response(400, "Invalid Form Body", 50035)
+        if request.query.get("wait") == "true":
+            return web.json_response({"id": request.app["stub"].new_snowflake(), "webhook_id": webhook_id, **payload})
+        return web.Response(status=204)
+    return await guarded(request, "webhooks", webhook_id, handler)
+
+
+async def get_stats(request):
+    return web.json_response(dict(request.app["stub"].stats))
+
+
+async def post_reset(request):
+    request.app["stub"].reset()
+    return web.Response(status=204)
+
+
+def create_app(options, on_interaction=None):
+    """Build the stub application; on_interaction(payload) is called for every accepted interaction"""
+    app = web.Application()
+    app["stub"] = StubState(options, on_interaction)
+    app.router.add_get(API_PREFIX + "/applications/{application_id}/commands", get_application_commands)
+    app.router.add_post(API_PREFIX + "/interactions", post_interaction)
+    app.router.add_post(API_PREFIX + "/webhooks/{webhook_id}/{token}", post_webhook)
+    app.router.add_get("/_stub/stats", get_stats)
+    app.router.add_post("/_stub/reset", post_reset)
+    return app
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=50, help="mean response latency in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="uniform +/- jitter in ms")
+    parser.add_argument("--commands", type=int, default=100, help="global commands per application (cmd0..cmdN-1)")
+    parser.add_argument("--command-names", nargs="*", default=[], help="extra global command names")
+    parser.add_argument("--commands-limit", default="50/1", help="command list bucket per application, N/seconds (0 = off)")
+    parser.add_argument("--interaction-limit", default="5/1", help="interaction bucket per token, N/seconds (0 = off)")
+    parser.add_argument("--webhook-limit", default="5/2", help="webhook bucket per webhook, N/seconds (0 = off)")
+    parser.add_argument("--burst-every", type=float, default=0, help="seconds between 5xx bursts (0 = off)")
+    parser.add_argument("--burst-duration", type=float, default=3, help="length of each 5xx burst in seconds")
+    parser.add_argument("--burst-status", type=int, default=503)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a random 500")
+    parser.add_argument("--unknown-bots", nargs="*", default=[], help="application ids answered with 10005 / 10002")
+    parser.add_argument("--unknown-rate", type=float, default=0.0, help="share of interactions answered with 10005")
+    return parser
+
+
+def finalize_options(options):
+    options.command_names = [f"cmd{index}" for index in range(options.commands)] + list(options.command_names)
+    return options
+
+
+def main():
+    options = finalize_options(build_parser().parse_args())
+    web.run_app(create_app(options), host=options.host, port=options.port)
+
+
+if __name__ == "__main__":
+    main()